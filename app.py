@@ -1,111 +1,499 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Request, Response, current_app, g, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 import os
+import logging
+import shutil
+import hashlib
+import tempfile
+import threading
+import uuid
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from werkzeug.exceptions import BadRequest
+from werkzeug.http import is_resource_modified
 from werkzeug.utils import secure_filename
 import json
-import traceback
+import orjson
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from zipfile import ZipFile
+from zipfile import ZipFile, ZIP_STORED
 import io
-from utils.data_processor import process_csv_xlsx, process_wav_textgrid
-from utils.visualizer import (
-    create_static_vowel_space, 
-    create_dynamic_formant_trajectory,
-    create_vowel_space_with_ellipses,
-    create_pca_plot,
-    create_lda_plot,
-    create_boxplot,
-    create_violin_plot,
-    create_histogram,
-    create_scatter_matrix,
-    create_mean_comparison_plot,
-    create_pairwise_comparison_plot
-)
-from utils.statistics import perform_comprehensive_analysis
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+from utils.data_processor import process_csv_xlsx_stream, process_wav_textgrid
+from utils.visualizer import create_static_vowel_space
+from utils.cache import LRUCache
+from utils.pipeline import create_upload_plot, render_analysis, render_spreadsheet
+from utils.outliers import remove_outliers_by_vowel
 from utils.formant_scales import convert_formants, get_scale_label, get_available_scales
 
 
-def convert_to_json_serializable(obj):
-    """Convert numpy types to native Python types for JSON serialization"""
-    if isinstance(obj, (np.bool_, bool)):
-        return bool(obj)
-    elif isinstance(obj, (np.integer, int)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, float)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.DEBUG if os.environ.get('FLASK_ENV') == 'development' else logging.WARNING
+)
+
+
+def _json_default(obj):
+    """Fallback for the rare objects orjson cannot serialize natively"""
+    if isinstance(obj, np.ndarray):
+        # object-dtype arrays (e.g. string labels)
         return obj.tolist()
-    elif isinstance(obj, dict):
-        return {key: convert_to_json_serializable(value) for key, value in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [convert_to_json_serializable(item) for item in obj]
-    elif isinstance(obj, str):
-        return obj
-    elif obj is None:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# orjson.Fragment (pre-encoded JSON embedded as-is) needs orjson >= 3.9
+HAS_ORJSON_FRAGMENT = hasattr(orjson, 'Fragment')
+
+
+def dumps_json(obj):
+    """Encode obj to JSON bytes with orjson"""
+    return orjson.dumps(obj, default=_json_default, option=JSON_OPTIONS)
+
+
+@lru_cache(maxsize=128)
+def _serialize_detected(detected_items):
+    """Encode a 'detected' column mapping; it depends only on the file's header"""
+    return dumps_json(dict(detected_items))
+
+
+def detection_fragment(detection_info):
+    """
+    Pre-encode column detection info as an orjson.Fragment
+    The 'detected' mapping is served from a cache keyed by its items; only the
+    data-dependent 'details' are encoded per request
+    With an orjson too old for fragments the dict is returned to be encoded as usual
+    """
+    if not detection_info:
         return None
+    if not HAS_ORJSON_FRAGMENT:
+        return detection_info
+    rest = {k: v for k, v in detection_info.items() if k != 'detected'}
+    body = b'{"detected":' + _serialize_detected(tuple(detection_info['detected'].items()))
+    if rest:
+        body += b',' + dumps_json(rest)[1:]
     else:
-        return obj
+        body += b'}'
+    return orjson.Fragment(body)
 
 
-def remove_outliers_by_vowel(df, std_threshold=3):
+def stream_json(payload, on_complete=None):
     """
-    Remove outliers from formant data on a per-vowel basis.
-    Values beyond ±std_threshold standard deviations from the mean are removed.
+    Stream a top-level JSON object one field at a time
     
-    Args:
-        df: DataFrame with 'vowel', 'F1', 'F2' columns
-        std_threshold: Number of standard deviations for outlier detection (default: 3)
+    The client starts receiving bytes while the larger fields (plots) are
+    still being encoded, and the full body is never held in memory at once.
     
-    Returns:
-        DataFrame with outliers removed
+    Args:
+        payload: dict to encode
+        on_complete: Optional callback receiving the full body (bytes) once
+            every chunk has been produced, e.g. to cache the response
     """
-    if df.empty or 'vowel' not in df.columns:
-        return df
+    def generate():
+        chunks = [] if on_complete is not None else None
+        separator = b'{'
+        for key, value in payload.items():
+            for chunk in (separator + orjson.dumps(key) + b':', dumps_json(value)):
+                if chunks is not None:
+                    chunks.append(chunk)
+                yield chunk
+            separator = b','
+        tail = b'}' if separator == b',' else b'{}'
+        yield tail
+        if chunks is not None:
+            chunks.append(tail)
+            on_complete(b''.join(chunks))
     
-    cleaned_rows = []
-    
-    for vowel in df['vowel'].unique():
-        vowel_data = df[df['vowel'] == vowel].copy()
-        
-        if len(vowel_data) < 3:  # Need at least 3 points for meaningful stats
-            cleaned_rows.append(vowel_data)
-            continue
-        
-        # Calculate mean and std for F1 and F2
-        f1_mean = vowel_data['F1'].mean()
-        f1_std = vowel_data['F1'].std()
-        f2_mean = vowel_data['F2'].mean()
-        f2_std = vowel_data['F2'].std()
-        
-        # Filter: keep only values within ±3 standard deviations
-        mask = (
-            (np.abs(vowel_data['F1'] - f1_mean) <= std_threshold * f1_std) &
-            (np.abs(vowel_data['F2'] - f2_mean) <= std_threshold * f2_std)
+    return Response(generate(), mimetype='application/json')
+
+
+# Trace fields that plotly.js (>= 2.28) accepts as base64-encoded typed arrays
+TYPED_ARRAY_KEYS = ('x', 'y', 'z', 'ids', 'customdata')
+TYPED_ARRAY_MIN_LENGTH = 32  # shorter arrays are cheaper to send as plain lists
+TYPED_ARRAY_DTYPES = {'i1', 'u1', 'i2', 'u2', 'i4', 'u4', 'f4', 'f8'}
+
+
+def _typed_array(values):
+    """Return a plotly typed-array spec for a 1-D numeric sequence, or None"""
+    if len(values) < TYPED_ARRAY_MIN_LENGTH:
+        return None
+    arr = np.asarray(values)
+    if arr.ndim != 1 or arr.dtype.kind not in 'iuf':
+        return None
+    if arr.dtype.kind in 'iu' and arr.dtype.itemsize == 8:
+        # plotly.js has no 64-bit integer arrays
+        info = np.iinfo(np.int32)
+        arr = arr.astype(np.int32 if info.min <= arr.min() and arr.max() <= info.max else np.float64)
+    arr = arr.astype(arr.dtype.newbyteorder('<'), copy=False)
+    dtype = arr.dtype.str[1:]
+    if dtype not in TYPED_ARRAY_DTYPES:
+        return None
+    return {'dtype': dtype, 'bdata': base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode('ascii')}
+
+
+def to_typed_arrays(plot):
+    """Replace numeric trace arrays in a plot dict with base64 typed arrays (in place)"""
+    if not plot:
+        return plot
+    traces = list(plot.get('data', []))
+    for frame in plot.get('frames', []) or []:
+        traces.extend(frame.get('data', []))
+    for trace in traces:
+        for key in TYPED_ARRAY_KEYS:
+            values = trace.get(key)
+            if isinstance(values, (list, tuple, np.ndarray)):
+                typed = _typed_array(values)
+                if typed is not None:
+                    trace[key] = typed
+    return plot
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson; numpy arrays and scalars are encoded natively"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_json(obj).decode()
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_json(obj), mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Compared against the lowercased extension of each upload
+ALLOWED_EXTENSIONS = frozenset({'wav', 'textgrid', 'csv', 'xlsx', 'xls', 'txt'})
+
+# Spreadsheet formats are parsed in memory; only audio/TextGrid files are written to disk
+TABLE_EXTENSIONS = {'csv', 'xlsx', 'xls', 'txt'}
+DISK_EXTENSIONS = ALLOWED_EXTENSIONS - TABLE_EXTENSIONS
+
+UPLOAD_COPY_BUFFER = 1024 * 1024  # 1MB chunks keep write() syscalls low for large WAV files
+SENDFILE_CHUNK = 64 * 1024 * 1024
+
+
+class UnsupportedUpload(BadRequest):
+    """Raised while parsing the form when a file part has a disallowed extension"""
+    description = 'File format not allowed.'
+
+
+class UploadRequest(Request):
+    """
+    Request that streams audio/TextGrid file parts straight into the upload folder
+    Werkzeug writes each part to the returned file while the body is still arriving,
+    so save_upload() only has to rename it instead of copying a spooled temp file
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_parts = set()  # part files not yet claimed by save_upload()
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Checked from the part headers, before any of the file's body is read
+        if filename and not allowed_file(filename):
+            raise UnsupportedUpload()
+        ext = file_ext(filename or '')
+        if ext not in DISK_EXTENSIONS:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        part = tempfile.NamedTemporaryFile(
+            dir=current_app.config['UPLOAD_FOLDER'], prefix='.upload_', suffix='.part',
+            delete=False, buffering=UPLOAD_COPY_BUFFER
         )
-        
-        cleaned_vowel_data = vowel_data[mask]
-        cleaned_rows.append(cleaned_vowel_data)
-    
-    if cleaned_rows:
-        result = pd.concat(cleaned_rows, ignore_index=True)
-        return result
-    else:
-        return df
+        self.upload_parts.add(part.name)
+        return part
+
+
+class VowelSpaceFlask(Flask):
+    json_provider_class = OrjsonProvider
+    request_class = UploadRequest
 
 
-app = Flask(__name__)
+app = VowelSpaceFlask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size for WAV/TextGrid
-app.config['ALLOWED_EXTENSIONS'] = {'wav', 'TextGrid', 'textgrid', 'csv', 'xlsx', 'xls', 'txt'}
+app.config['ALLOWED_EXTENSIONS'] = ALLOWED_EXTENSIONS
+
+# Compress JSON responses (plot payloads shrink 5-10x); small error bodies are left as-is
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_LEVEL'] = 4
+app.config['COMPRESS_BR_LEVEL'] = 4
+if Compress is not None:
+    Compress(app)
 
 # Create upload folder if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 
+def file_ext(filename):
+    """Lowercased extension of filename without the dot ('' if there is none)"""
+    _, dot, ext = filename.rpartition('.')
+    return ext.lower() if dot else ''
+
+
 def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    return file_ext(filename) in ALLOWED_EXTENSIONS
+
+
+# CPU-bound parsing and plotting runs in worker processes so request threads stay free
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared process pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return _executor
+
+
+# Rendered /upload responses keyed by (file digest, ext, visualization options)
+response_cache = LRUCache(maxsize=32)
+
+# Parsed spreadsheets (data in Hz, detection_info) keyed by (file digest, ext), so
+# re-uploads with other options or sent to /analyze skip parsing and column detection.
+# Cached frames are shared between requests and must not be modified in place.
+parse_cache = LRUCache(maxsize=16)
+
+# Background jobs for clients that send async=true; finished jobs are kept until their result is fetched
+jobs = LRUCache(maxsize=64)
+_job_executor = None
+
+
+def get_job_executor():
+    """Return the thread pool that waits on background jobs, creating it on first use"""
+    global _job_executor
+    with _executor_lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        return _job_executor
+
+
+def submit_job(fn, *args):
+    """Run fn(*args) -> (body, status) in the background and answer 202 with the job id"""
+    job_id = uuid.uuid4().hex
+    jobs.put(job_id, get_job_executor().submit(fn, *args))
+    return jsonify({'success': True, 'job_id': job_id, 'status': 'pending'}), 202
+
+
+def vowel_inventory(data):
+    """
+    List the vowels in data
+    Categorical columns (as produced by the data processors) are read from the
+    category index in O(k) instead of scanning every row
+    """
+    if 'vowel' not in data.columns:
+        return []
+    vowels = data['vowel']
+    if isinstance(vowels.dtype, pd.CategoricalDtype):
+        return vowels.cat.categories.tolist()
+    return vowels.unique().tolist()
+
+
+def data_error_message(detection_info):
+    """User-facing message for uploads that produced no usable formant data"""
+    err_msg = 'Data processing failed. Please include F1 and F2 columns or provide numeric columns in reasonable formant ranges (F1: 200–1000 Hz, F2: 800–3000 Hz).'
+    # If we have detection info, include a hint
+    if detection_info is not None:
+        try:
+            detected_cols = detection_info.get('detected', {})
+            err_msg += f" Detected columns: {detected_cols}."
+        except Exception:
+            pass
+    return err_msg
+
+
+def upload_payload(plot_json, data, data_source, detection_info):
+    """Build the /upload response body"""
+    return {
+        'success': True,
+        'plot': to_typed_arrays(plot_json),
+        'data_source': data_source,
+        'data_summary': {
+            'rows': len(data),
+            'vowels': vowel_inventory(data),
+            'columns': data.columns.tolist(),
+            'column_detection': detection_fragment(detection_info)
+        }
+    }
+
+
+def analysis_payload(analysis_results, plots, detection_info):
+    """Build the /analyze response body"""
+    plots = {name: to_typed_arrays(plot) for name, plot in plots.items()}
+    
+    # Remove large data objects before sending
+    analysis_results = {
+        k: v for k, v in analysis_results.items()
+        if k != 'pca_data' and not k.startswith('lda_data_')
+    }
+    
+    return {
+        'success': True,
+        'analysis': analysis_results,
+        'plots': plots,
+        'column_detection': detection_fragment(detection_info)
+    }
+
+
+def _upload_job(raw, ext, plot_options, response_key):
+    """Background version of the spreadsheet branch of /upload"""
+    data, detection_info, plot_json = get_executor().submit(render_spreadsheet, raw, ext, plot_options).result()
+    if data is not None:
+        parse_cache.put(response_key[:2], (data, detection_info))
+    if data is None or data.empty:
+        return dumps_json({'error': data_error_message(detection_info)}), 400
+    if plot_json is None:
+        return dumps_json({'error': 'Visualization creation failed.'}), 500
+    body = dumps_json(upload_payload(plot_json, data, 'csv', detection_info))
+    response_cache.put(response_key, body)
+    return body, 200
+
+
+def _analysis_job(data, detection_info, formant_scale):
+    """Background version of /analyze once the upload has been parsed"""
+    analysis_results, plots = get_executor().submit(render_analysis, data, formant_scale).result()
+    return dumps_json(analysis_payload(analysis_results, plots, detection_info)), 200
+
+
+def hash_stream(stream):
+    """Return the SHA-256 hex digest of a seekable binary stream, leaving it rewound"""
+    stream.seek(0)
+    if hasattr(hashlib, 'file_digest'):
+        digest = hashlib.file_digest(stream, 'sha256')
+    else:
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: stream.read(UPLOAD_COPY_BUFFER), b''):
+            digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _silent_unlink(path):
+    """Remove a file, ignoring it if it is already gone"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _stream_fileno(stream):
+    """Return the file descriptor behind stream, or None if it is in memory"""
+    if isinstance(stream, tempfile.SpooledTemporaryFile) and not stream._rolled:
+        # fileno() would force the spooled data out to disk first
+        return None
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def save_upload(file, filepath):
+    """Move an uploaded file into place, copying it in large chunks if it was not streamed to disk"""
+    part = getattr(file.stream, 'name', None)
+    if part in request.upload_parts:
+        file.stream.close()
+        os.replace(part, filepath)
+        request.upload_parts.discard(part)
+        return
+    src = file.stream
+    src.seek(0)
+    src_fd = _stream_fileno(src) if hasattr(os, 'sendfile') else None
+    with open(filepath, 'wb', buffering=0) as dst:
+        if src_fd is None:
+            shutil.copyfileobj(src, dst, length=UPLOAD_COPY_BUFFER)
+            return
+        # Disk-backed stream: copy in the kernel without passing the bytes through Python
+        src.flush()
+        offset = 0
+        while True:
+            sent = os.sendfile(dst.fileno(), src_fd, offset, SENDFILE_CHUNK)
+            if sent == 0:
+                break
+            offset += sent
+
+
+@app.before_request
+def reject_unsupported_uploads():
+    """Parse multipart bodies up front so a disallowed file ends the request early"""
+    if request.method == 'POST' and request.mimetype == 'multipart/form-data':
+        try:
+            request.files
+        except UnsupportedUpload as e:
+            response = jsonify({'success': False, 'error': e.description})
+            response.status_code = 400
+            # The rest of the body was never read, so the connection cannot be reused
+            response.headers['Connection'] = 'close'
+            return response
+
+
+@app.teardown_request
+def remove_unclaimed_parts(exc):
+    """Delete streamed upload parts that were never moved into place (e.g. rejected files)"""
+    for part in getattr(request, 'upload_parts', ()):
+        _silent_unlink(part)
+    workdir = g.pop('workdir', None)
+    if workdir is not None:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def request_workdir():
+    """
+    Private directory for the files saved by this request, removed at teardown
+    Concurrent uploads of files with the same name no longer overwrite each other
+    """
+    if 'workdir' not in g:
+        g.workdir = tempfile.mkdtemp(prefix='vs_', dir=app.config['UPLOAD_FOLDER'])
+    return g.workdir
+
+
+SESSION_COOKIE = 'vs_session'
+
+
+def client_session_id():
+    """Per-browser id (issued as a cookie) that keys the user's last WAV extraction"""
+    sid = request.cookies.get(SESSION_COOKIE, '')
+    try:
+        # Used in file names, so only accept ids in the format we issue
+        if uuid.UUID(hex=sid).hex == sid:
+            return sid
+    except ValueError:
+        pass
+    if 'new_session_id' not in g:
+        g.new_session_id = uuid.uuid4().hex
+    return g.new_session_id
+
+
+@app.after_request
+def issue_session_cookie(response):
+    sid = g.get('new_session_id')
+    if sid is not None:
+        response.set_cookie(SESSION_COOKIE, sid, max_age=30 * 24 * 3600, httponly=True, samesite='Lax')
+    return response
+
+
+def last_extraction_path(name):
+    """Path of this client's copy of a last-extraction file ('data.csv' or 'metadata.json')"""
+    return os.path.join(app.config['UPLOAD_FOLDER'], f'last_extracted_{client_session_id()}_{name}')
 
 
 @app.route('/')
@@ -115,6 +503,7 @@ def index():
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    uploaded_files = []  # defined before try so error cleanup never hits a NameError
     try:
         if 'files' not in request.files:
             return jsonify({'error': 'No file was uploaded.'}), 400
@@ -128,17 +517,27 @@ def upload_file():
         if not files or files[0].filename == '':
             return jsonify({'error': 'Please select a file.'}), 400
         
-        uploaded_files = []
         for file in files:
             if file and allowed_file(file.filename):
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
+                ext = file_ext(file.filename)
+                if ext in TABLE_EXTENSIONS:
+                    # Spreadsheets are parsed straight from the upload stream
+                    uploaded_files.append({
+                        'name': filename,
+                        'path': None,
+                        'ext': ext,
+                        'stream': file.stream
+                    })
+                    continue
+                filepath = os.path.join(request_workdir(), filename)
+                # Register before saving so a failed save is still cleaned up
                 uploaded_files.append({
                     'name': filename,
                     'path': filepath,
-                    'ext': filename.rsplit('.', 1)[1].lower()
+                    'ext': ext
                 })
+                save_upload(file, filepath)
         
         if not uploaded_files:
             return jsonify({'error': 'File format not allowed.'}), 400
@@ -146,37 +545,69 @@ def upload_file():
         # Process files based on type
         data = None
         detection_info = None
-        file_types = [f['ext'] for f in uploaded_files]
-        
-        if 'csv' in file_types or 'xlsx' in file_types or 'xls' in file_types or 'txt' in file_types:
-            # Process spreadsheet data with auto-detection
-            for f in uploaded_files:
-                if f['ext'] in ['csv', 'xlsx', 'xls', 'txt']:
-                    print(f"Processing file: {f['path']}")  # Debug log
-                    result = process_csv_xlsx(f['path'], auto_detect=True)
-                    
-                    # Handle tuple return (df, detection_info)
-                    if isinstance(result, tuple):
-                        data, detection_info = result
-                    else:
-                        data = result
-                    
-                    print(f"Data shape: {data.shape if data is not None and not data.empty else 'Empty'}")  # Debug log
-                    if detection_info:
-                        print(f"Detected columns: {detection_info['detected']}")
-                    break
+        file_types = {f['ext'] for f in uploaded_files}
+        
+        # Re-uploads of the same spreadsheet with the same options (e.g. while
+        # toggling ellipses) reuse the previously rendered response
+        response_key = None
+        table_files = [f for f in uploaded_files if f['ext'] in TABLE_EXTENSIONS]
+        if table_files:
+            response_key = (
+                hash_stream(table_files[0]['stream']), table_files[0]['ext'],
+                visualization_type, show_ellipses, show_points, formant_scale
+            )
+            cached_body = response_cache.get(response_key)
+            if cached_body is not None:
+                for f in uploaded_files:
+                    if f['path']:
+                        _silent_unlink(f['path'])
+                return Response(cached_body, mimetype='application/json')
+            
+            # Opt-in background processing; the client polls /status/<job_id> and fetches /result/<job_id>
+            if request.form.get('async', 'false') == 'true' and 'wav' not in file_types:
+                f = table_files[0]
+                f['stream'].seek(0)
+                plot_options = (visualization_type, show_ellipses, show_points, formant_scale)
+                return submit_job(_upload_job, f['stream'].read(), f['ext'], plot_options, response_key)
+        
+        plot_json = None
+        rendered = False
+        if table_files:
+            # Process spreadsheet data with auto-detection in a worker process.
+            # When WAV files are uploaded alongside, plotting waits for outlier removal below.
+            f = table_files[0]
+            parse_key = response_key[:2]
+            parsed = parse_cache.get(parse_key)
+            if parsed is not None:
+                # Same file with other options: only the plot is rebuilt below
+                logger.debug("Using cached parse of %s", f['name'])
+                data, detection_info = parsed
+            else:
+                logger.debug("Processing file: %s", f['name'])
+                plot_options = None if 'wav' in file_types else (visualization_type, show_ellipses, show_points, formant_scale)
+                f['stream'].seek(0)
+                future = get_executor().submit(render_spreadsheet, f['stream'].read(), f['ext'], plot_options)
+                data, detection_info, plot_json = future.result()
+                rendered = plot_options is not None
+                if data is not None:
+                    parse_cache.put(parse_key, (data, detection_info))
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Data shape: %s", data.shape if data is not None and not data.empty else 'Empty')
+                if detection_info:
+                    logger.debug("Detected columns: %s", detection_info['detected'])
         
         elif 'wav' in file_types:
             # Process WAV and TextGrid files
             wav_files = [f for f in uploaded_files if f['ext'] == 'wav']
-            textgrid_files = [f for f in uploaded_files if f['ext'] in ['textgrid', 'TextGrid']]
+            textgrid_files = [f for f in uploaded_files if f['ext'] == 'textgrid']
             
             # Validate that WAV and TextGrid files are paired
             if len(wav_files) != len(textgrid_files):
                 # Clean up uploaded files
                 for f in uploaded_files:
-                    if os.path.exists(f['path']):
-                        os.remove(f['path'])
+                    if f['path']:
+                        _silent_unlink(f['path'])
                 return jsonify({
                     'error': f'Number of WAV files ({len(wav_files)}) does not match number of TextGrid files ({len(textgrid_files)}). Each WAV file must have a corresponding TextGrid file with the same basename.'
                 }), 400
@@ -196,16 +627,17 @@ def upload_file():
                 
                 # Clean up uploaded files
                 for f in uploaded_files:
-                    if os.path.exists(f['path']):
-                        os.remove(f['path'])
+                    if f['path']:
+                        _silent_unlink(f['path'])
                 return jsonify({'error': error_msg}), 400
             
-            print(f"Processing {len(wav_files)} WAV/TextGrid pairs")
+            logger.debug("Processing %d WAV/TextGrid pairs", len(wav_files))
             wav_paths = [f['path'] for f in wav_files]
             textgrid_paths = [f['path'] for f in textgrid_files]
             
             # Process with metadata extraction
-            result = process_wav_textgrid(wav_paths, textgrid_paths)
+            # Each WAV/TextGrid pair is extracted in its own worker process
+            result = process_wav_textgrid(wav_paths, textgrid_paths, executor=get_executor())
             if isinstance(result, tuple):
                 data, metadata = result
             else:
@@ -214,8 +646,7 @@ def upload_file():
             
             # Store metadata for later download
             if metadata:
-                import json
-                metadata_path = os.path.join(app.config['UPLOAD_FOLDER'], 'last_metadata.json')
+                metadata_path = last_extraction_path('metadata.json')
                 with open(metadata_path, 'w') as f:
                     json.dump(metadata, f, indent=2)
         
@@ -224,129 +655,115 @@ def upload_file():
         
         if data is None or data.empty:
             # Return a user-friendly 400 error instead of 500 for invalid/empty data
-            err_msg = 'Data processing failed. Please include F1 and F2 columns or provide numeric columns in reasonable formant ranges (F1: 200–1000 Hz, F2: 800–3000 Hz).'
-            # If we have detection info, include a hint
-            if detection_info is not None:
-                try:
-                    detected_cols = detection_info.get('detected', {})
-                    err_msg += f" Detected columns: {detected_cols}."
-                except Exception:
-                    pass
-            return jsonify({'error': err_msg}), 400
-        
-        # Save extracted data as CSV for WAV/TextGrid processing
+            return jsonify({'error': data_error_message(detection_info)}), 400
+        
+        # Keep extracted data for /download-extracted-data (WAV/TextGrid processing)
         if 'wav' in file_types:
-            # Remove outliers: values beyond ±3 standard deviations per vowel
+            # Remove outliers: values beyond 3 scaled MADs from the vowel median
             data_cleaned = remove_outliers_by_vowel(data)
             
-            csv_path = os.path.join(app.config['UPLOAD_FOLDER'], 'last_extracted_data.csv')
-            # Sort by vowel (alphabetically) and then by F1 (ascending)
-            data_sorted = data_cleaned.sort_values(by=['vowel', 'F1'], ascending=[True, True])
-            data_sorted.to_csv(csv_path, index=False)
+            # Stored as a pickle (a near-verbatim dump of the column buffers); sorting and
+            # CSV formatting are deferred until the user actually downloads the data.
+            # A file rather than an in-memory cache, because any gunicorn worker may serve the download.
+            data_path = last_extraction_path('data.pkl')
+            data_cleaned.to_pickle(data_path)
             
             # Log outlier removal stats
             original_count = len(data)
             cleaned_count = len(data_cleaned)
             removed_count = original_count - cleaned_count
-            print(f"Outlier removal: {removed_count} points removed ({original_count} → {cleaned_count})")
-            print(f"Extracted data saved to {csv_path} (sorted by vowel and F1)")
+            logger.debug("Outlier removal: %d points removed (%d → %d)", removed_count, original_count, cleaned_count)
+            logger.debug("Extracted data saved to %s", data_path)
             
             # Update data for visualization (use cleaned data)
             data = data_cleaned
         
-        # Convert formant scale if needed
-        if formant_scale != 'Hz':
-            data = convert_formants(data, from_scale='Hz', to_scale=formant_scale)
-        
-        # Create visualization with scale label
-        scale_label = get_scale_label(formant_scale)
-        
-        if visualization_type == 'static':
-            if show_ellipses:
-                plot_json = create_vowel_space_with_ellipses(data, confidence_level=0.95, show_points=show_points, scale=scale_label)
-            else:
-                plot_json = create_static_vowel_space(data, scale=scale_label)
-        elif visualization_type == 'dynamic':
-            plot_json = create_dynamic_formant_trajectory(data, scale=scale_label)
-        elif visualization_type == 'ellipse':
-            plot_json = create_vowel_space_with_ellipses(data, confidence_level=0.95, show_points=show_points, scale=scale_label)
-        else:
-            plot_json = create_static_vowel_space(data, scale=scale_label)
+        if not rendered:
+            # Convert formant scale if needed
+            if formant_scale != 'Hz':
+                data = convert_formants(data, from_scale='Hz', to_scale=formant_scale)
+            
+            # Create visualization with scale label
+            scale_label = get_scale_label(formant_scale)
+            plot_json = create_upload_plot(data, visualization_type, show_ellipses, show_points, scale_label)
         
         if plot_json is None:
             return jsonify({'error': 'Visualization creation failed.'}), 500
         
         # Clean up uploaded files
         for f in uploaded_files:
-            if os.path.exists(f['path']):
-                os.remove(f['path'])
+            if f['path']:
+                _silent_unlink(f['path'])
         
         # Determine data source type
         data_source = 'wav_textgrid' if 'wav' in file_types else 'csv'
         
-        return jsonify({
-            'success': True,
-            'plot': plot_json,
-            'data_source': data_source,
-            'data_summary': {
-                'rows': len(data),
-                'vowels': data['vowel'].unique().tolist() if 'vowel' in data.columns else [],
-                'columns': data.columns.tolist(),
-                'column_detection': detection_info if detection_info else None
-            }
-        })
+        cache_response = None
+        if response_key is not None:
+            def cache_response(body):
+                response_cache.put(response_key, body)
+        
+        return stream_json(
+            upload_payload(plot_json, data, data_source, detection_info),
+            on_complete=cache_response
+        )
     
     except Exception as e:
-        print(f"Error in upload: {str(e)}")  # Debug log
-        print(traceback.format_exc())  # Full traceback
+        logger.exception("Error in upload")
         
         # Clean up uploaded files on error
-        try:
-            for f in uploaded_files:
-                if os.path.exists(f['path']):
-                    os.remove(f['path'])
-        except:
-            pass
+        for f in uploaded_files:
+            if f['path']:
+                _silent_unlink(f['path'])
         
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
 
-@app.route('/example')
-def example_data():
-    """Provide example data"""
-    import pandas as pd
-    import numpy as np
-    
-    # Example static data
-    vowels = ['i', 'e', 'a', 'o', 'u']
-    data = []
-    for vowel in vowels:
-        for _ in range(10):
-            if vowel == 'i':
-                f1, f2 = np.random.normal(300, 20), np.random.normal(2300, 100)
-            elif vowel == 'e':
-                f1, f2 = np.random.normal(450, 30), np.random.normal(2100, 100)
-            elif vowel == 'a':
-                f1, f2 = np.random.normal(700, 40), np.random.normal(1200, 100)
-            elif vowel == 'o':
-                f1, f2 = np.random.normal(500, 30), np.random.normal(900, 80)
-            else:  # u
-                f1, f2 = np.random.normal(350, 25), np.random.normal(800, 80)
-            
-            data.append({'vowel': vowel, 'F1': f1, 'F2': f2})
-    
-    df = pd.DataFrame(data)
-    plot_json = create_static_vowel_space(df)
+# Example vowels: F1 mean, F1 std, F2 mean, F2 std (Hz)
+_VOWEL_PARAMS = {
+    'i': (300, 20, 2300, 100),
+    'e': (450, 30, 2100, 100),
+    'a': (700, 40, 1200, 100),
+    'o': (500, 30, 900, 80),
+    'u': (350, 25, 800, 80),
+}
+
+
+def _build_example_df(n_per_vowel=10):
+    """Synthetic five-vowel dataset shown by /example (fixed seed, so it is identical on every call)"""
+    vowels = list(_VOWEL_PARAMS)
+    f1_means, f1_stds, f2_means, f2_stds = np.array(list(_VOWEL_PARAMS.values()), dtype=float).T[:, :, None]
     
-    return jsonify({
+    # One draw per formant for all vowels at once
+    rng = np.random.default_rng(0)
+    size = (len(vowels), n_per_vowel)
+    return pd.DataFrame({
+        'vowel': np.repeat(vowels, n_per_vowel),
+        'F1': rng.normal(f1_means, f1_stds, size=size).ravel(),
+        'F2': rng.normal(f2_means, f2_stds, size=size).ravel()
+    })
+
+
+@lru_cache(maxsize=1)
+def _example_body():
+    """Encoded /example response, built on first use"""
+    plot_json = to_typed_arrays(create_static_vowel_space(_build_example_df()))
+    return dumps_json({
         'success': True,
         'plot': plot_json
     })
 
 
+@app.route('/example')
+def example_data():
+    """Provide example data"""
+    return Response(_example_body(), mimetype='application/json')
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze_data():
     """Statistical analysis endpoint"""
+    uploaded_files = []  # defined before try so error cleanup never hits a NameError
     try:
         if 'files' not in request.files:
             return jsonify({'success': False, 'error': 'No file uploaded'}), 400
@@ -357,17 +774,27 @@ def analyze_data():
         if not files or files[0].filename == '':
             return jsonify({'success': False, 'error': 'No file selected'}), 400
         
-        uploaded_files = []
         for file in files:
             if file and allowed_file(file.filename):
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
+                ext = file_ext(file.filename)
+                if ext in TABLE_EXTENSIONS:
+                    # Spreadsheets are parsed straight from the upload stream
+                    uploaded_files.append({
+                        'name': filename,
+                        'path': None,
+                        'ext': ext,
+                        'stream': file.stream
+                    })
+                    continue
+                filepath = os.path.join(request_workdir(), filename)
+                # Register before saving so a failed save is still cleaned up
                 uploaded_files.append({
                     'name': filename,
                     'path': filepath,
-                    'ext': filename.rsplit('.', 1)[1].lower()
+                    'ext': ext
                 })
+                save_upload(file, filepath)
         
         if not uploaded_files:
             return jsonify({'success': False, 'error': 'Invalid file format'}), 400
@@ -375,190 +802,161 @@ def analyze_data():
         # Process files
         data = None
         detection_info = None
-        file_types = [f['ext'] for f in uploaded_files]
+        file_types = {f['ext'] for f in uploaded_files}
         
-        if 'csv' in file_types or 'xlsx' in file_types or 'xls' in file_types or 'txt' in file_types:
+        if file_types & TABLE_EXTENSIONS:
             for f in uploaded_files:
-                if f['ext'] in ['csv', 'xlsx', 'xls', 'txt']:
-                    result = process_csv_xlsx(f['path'], auto_detect=True)
+                if f['ext'] in TABLE_EXTENSIONS:
+                    parse_key = (hash_stream(f['stream']), f['ext'])
+                    parsed = parse_cache.get(parse_key)
+                    if parsed is not None:
+                        data, detection_info = parsed
+                        break
+                    
+                    result = process_csv_xlsx_stream(f['stream'], f['ext'], auto_detect=True)
                     
                     if isinstance(result, tuple):
                         data, detection_info = result
                     else:
                         data = result
+                    if data is not None:
+                        parse_cache.put(parse_key, (data, detection_info))
                     break
         
         if data is None or data.empty:
             return jsonify({'success': False, 'error': 'Failed to process data'}), 500
         
-        # Limit speakers to 10 randomly if more than 10
-        if 'speaker' in data.columns:
-            unique_speakers = data['speaker'].unique()
-            if len(unique_speakers) > 10:
-                import random
-                random.seed(42)  # For reproducibility
-                selected_speakers = random.sample(list(unique_speakers), 10)
-                data = data[data['speaker'].isin(selected_speakers)].copy()
-                print(f"Limited to 10 random speakers from {len(unique_speakers)} total speakers")
-        
-        # Convert formant scale if needed
-        if formant_scale != 'Hz':
-            data = convert_formants(data, from_scale='Hz', to_scale=formant_scale)
-        
-        # Perform comprehensive analysis
-        analysis_results = perform_comprehensive_analysis(data)
-        
-        # Create visualizations with scale label
-        scale_label = get_scale_label(formant_scale)
-        plots = {}
-        
-        # PCA plot
-        if 'pca_data' in analysis_results:
-            plots['pca'] = create_pca_plot(analysis_results['pca_data'], analysis_results['pca'], scale=scale_label)
-        
-        # LDA plots
-        if 'vowel' in data.columns and 'lda_data_vowel' in analysis_results:
-            plots['lda_vowel'] = create_lda_plot(
-                analysis_results['lda_data_vowel'], 
-                analysis_results['lda']['vowel'],
-                group_by='vowel',
-                scale=scale_label
-            )
+        # Clean up uploaded files
+        for f in uploaded_files:
+            if f['path']:
+                _silent_unlink(f['path'])
         
-        if 'speaker' in data.columns and 'lda_data_speaker' in analysis_results:
-            plots['lda_speaker'] = create_lda_plot(
-                analysis_results['lda_data_speaker'],
-                analysis_results['lda']['speaker'],
-                group_by='speaker',
-                scale=scale_label
-            )
+        # Opt-in background processing; the client polls /status/<job_id> and fetches /result/<job_id>
+        if request.form.get('async', 'false') == 'true':
+            return submit_job(_analysis_job, data, detection_info, formant_scale)
         
-        if 'native_language' in data.columns and 'lda_data_native_language' in analysis_results:
-            plots['lda_language'] = create_lda_plot(
-                analysis_results['lda_data_native_language'],
-                analysis_results['lda']['native_language'],
-                group_by='native_language',
-                scale=scale_label
-            )
+        analysis_results, plots = render_analysis(data, formant_scale)
         
-        # Statistical plots - create for each available grouping variable
-        grouping_vars = []
-        if 'vowel' in data.columns:
-            grouping_vars.append('vowel')
-        if 'speaker' in data.columns:
-            grouping_vars.append('speaker')
-        if 'native_language' in data.columns:
-            grouping_vars.append('native_language')
-        
-        for group_var in grouping_vars:
-            # Box plot
-            boxplot = create_boxplot(data, group_by=group_var, scale=scale_label)
-            if boxplot:
-                plots[f'boxplot_{group_var}'] = boxplot
-            
-            # Violin plot
-            violin = create_violin_plot(data, group_by=group_var, scale=scale_label)
-            if violin:
-                plots[f'violin_{group_var}'] = violin
-            
-            # Histogram
-            histogram = create_histogram(data, group_by=group_var, scale=scale_label)
-            if histogram:
-                plots[f'histogram_{group_var}'] = histogram
-            
-            # Mean comparison plot
-            mean_plot = create_mean_comparison_plot(data, group_by=group_var, scale=scale_label)
-            if mean_plot:
-                plots[f'mean_comparison_{group_var}'] = mean_plot
-            
-            # Pairwise comparison plot
-            if 'pairwise' in analysis_results and group_var in analysis_results['pairwise']:
-                pairwise_plot = create_pairwise_comparison_plot(
-                    analysis_results['pairwise'][group_var], 
-                    scale=scale_label
-                )
-                if pairwise_plot:
-                    plots[f'pairwise_{group_var}'] = pairwise_plot
-        
-        # Scatter matrix (not grouped)
-        if grouping_vars:
-            scatter_matrix = create_scatter_matrix(data, color_by=grouping_vars[0])
-            if scatter_matrix:
-                plots['scatter_matrix'] = scatter_matrix
-        
-        # Remove large data objects before sending
-        if 'pca_data' in analysis_results:
-            del analysis_results['pca_data']
-        
-        keys_to_remove = [k for k in analysis_results.keys() if k.startswith('lda_data_')]
-        for key in keys_to_remove:
-            del analysis_results[key]
-        
-        # Convert all numpy types to JSON serializable types
-        analysis_results = convert_to_json_serializable(analysis_results)
-        plots = convert_to_json_serializable(plots)
-        
-        # Clean up uploaded files
-        for f in uploaded_files:
-            if os.path.exists(f['path']):
-                os.remove(f['path'])
-        
-        return jsonify({
-            'success': True,
-            'analysis': analysis_results,
-            'plots': plots,
-            'column_detection': detection_info
-        })
+        return stream_json(analysis_payload(analysis_results, plots, detection_info))
     
     except Exception as e:
-        print(f"Error in analysis: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error in analysis")
         
         # Clean up on error
-        try:
-            for f in uploaded_files:
-                if os.path.exists(f['path']):
-                    os.remove(f['path'])
-        except:
-            pass
+        for f in uploaded_files:
+            if f['path']:
+                _silent_unlink(f['path'])
         
         return jsonify({'success': False, 'error': f'Analysis failed: {str(e)}'}), 500
 
 
+@app.route('/status/<job_id>')
+def job_status(job_id):
+    """Report the state of a background /upload or /analyze job"""
+    future = jobs.get(job_id)
+    if future is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    if future.done():
+        status = 'failed' if future.exception() is not None else 'done'
+    else:
+        status = 'running' if future.running() else 'pending'
+    return jsonify({'success': True, 'job_id': job_id, 'status': status})
+
+
+@app.route('/result/<job_id>')
+def job_result(job_id):
+    """Return the response of a finished background job (once; the job is then forgotten)"""
+    future = jobs.get(job_id)
+    if future is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    if not future.done():
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'running'}), 202
+    jobs.pop(job_id)
+    try:
+        body, status = future.result()
+    except Exception as e:
+        logger.error("Error in job %s", job_id, exc_info=e)
+        return jsonify({'success': False, 'error': f'Job failed: {str(e)}'}), 500
+    return Response(body, status=status, mimetype='application/json')
+
+
+def stat_validators(stats):
+    """ETag and Last-Modified for content derived from files with the given os.stat results"""
+    digest = hashlib.sha256()
+    for st in stats:
+        digest.update(f'{st.st_mtime_ns}:{st.st_size};'.encode())
+    return digest.hexdigest()[:32], max(st.st_mtime for st in stats)
+
+
+def not_modified(etag, last_modified):
+    """304 response if the client's cached copy is still current, otherwise None"""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write-only file object whose written bytes are drained by a generator"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return b''.join(chunks)
+
+
 @app.route('/download-examples')
 def download_examples():
     """Download example CSV files as a ZIP archive"""
     try:
-        # Create in-memory ZIP file
-        memory_file = io.BytesIO()
-        
         # Path to test folder
         test_folder = Path(__file__).parent / 'test'
         
-        with ZipFile(memory_file, 'w') as zf:
-            # Find all CSV files in test folder
-            csv_files = list(test_folder.glob('*.csv'))
-            
-            if not csv_files:
-                return jsonify({'error': 'No example CSV files found'}), 404
-            
-            # Add each CSV file to the ZIP
-            for csv_file in csv_files:
-                zf.write(csv_file, arcname=csv_file.name)
-        
-        # Seek to the beginning of the BytesIO object
-        memory_file.seek(0)
-        
-        return send_file(
-            memory_file,
+        # Find all CSV files in test folder
+        csv_files = sorted(test_folder.glob('*.csv'))
+        
+        if not csv_files:
+            return jsonify({'error': 'No example CSV files found'}), 404
+        
+        # The examples only change on deploy; repeat downloads are answered with 304
+        etag, last_modified = stat_validators([f.stat() for f in csv_files])
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+        
+        def generate():
+            # ZipFile writes data descriptors when the target is unseekable, so each
+            # file can be sent as soon as it is added; CSVs are stored uncompressed
+            # (the response itself may still be compressed on the wire)
+            sink = _ChunkSink()
+            with ZipFile(sink, 'w', compression=ZIP_STORED) as zf:
+                for csv_file in csv_files:
+                    zf.write(csv_file, arcname=csv_file.name)
+                    yield sink.drain()
+            yield sink.drain()
+        
+        response = Response(
+            generate(),
             mimetype='application/zip',
-            as_attachment=True,
-            download_name='vowelspace_examples.zip'
+            headers={'Content-Disposition': 'attachment; filename=vowelspace_examples.zip'}
         )
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        return response
     
     except Exception as e:
-        print(f"Error in download-examples: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error in download-examples")
         return jsonify({'error': f'Download failed: {str(e)}'}), 500
 
 
@@ -566,23 +964,47 @@ def download_examples():
 def download_extracted_data():
     """Download extracted formant data as CSV"""
     try:
-        csv_path = os.path.join(app.config['UPLOAD_FOLDER'], 'last_extracted_data.csv')
-        
-        if not os.path.exists(csv_path):
+        data_path = last_extraction_path('data.pkl')
+        try:
+            etag, last_modified = stat_validators([os.stat(data_path)])
+        except FileNotFoundError:
             return jsonify({'error': 'No extracted data available. Please upload and analyze WAV/TextGrid files first.'}), 404
         
+        # Unchanged since the client's last download: skip loading and formatting entirely
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
+        
+        data = pd.read_pickle(data_path)
+        
+        # Sort by vowel (alphabetically) and then by F1 (ascending)
+        data_sorted = data.sort_values(by=['vowel', 'F1'], ascending=[True, True])
+        csv_file = io.BytesIO(data_sorted.to_csv(index=False).encode('utf-8'))
+        
         return send_file(
-            csv_path,
+            csv_file,
             mimetype='text/csv',
             as_attachment=True,
-            download_name='extracted_vowel_formants.csv'
+            download_name='extracted_vowel_formants.csv',
+            etag=etag,
+            last_modified=last_modified
         )
     
     except Exception as e:
-        print(f"Error in download-extracted-data: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Error in download-extracted-data")
         return jsonify({'error': f'Download failed: {str(e)}'}), 500
 
 
+def prewarm():
+    """
+    Build a throwaway plot so plotly's lazily imported validators and pandas'
+    CSV parser are loaded at startup instead of during the first upload
+    Called from the gunicorn worker hook in gunicorn.conf.py, not at import
+    """
+    df = pd.read_csv(io.StringIO('vowel,F1,F2\na,700,1200\ni,300,2300\n'))
+    dumps_json(create_static_vowel_space(df, scale=get_scale_label('Hz')))
+
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs under gunicorn (see wsgi.py)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
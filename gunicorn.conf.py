@@ -0,0 +1,10 @@
+"""
+gunicorn settings picked up automatically from the working directory
+Command-line options (Procfile, run.sh) still take precedence
+"""
+
+
+def post_worker_init(worker):
+    """Pre-warm plotly and pandas in each worker once the app is loaded, before it serves requests"""
+    from app import prewarm
+    prewarm()
@@ -11,7 +11,7 @@
 #tail -f server.log
 
 # 서버 상태 확인
-# ps aux | grep app.py
+# ps aux | grep gunicorn
 
 # Change to vowelspace directory
 cd /var/www/html/vowelspace || exit 1
@@ -23,7 +23,8 @@ sleep 1
 
 # Start server with nohup (survives terminal close)
 echo "Starting vowelspace server..."
-nohup python3 app.py > server.log 2>&1 &
+# gunicorn runs one worker process per core so concurrent uploads do not queue
+nohup gunicorn -w "$(nproc)" -k gthread --threads 4 -t 120 -b 0.0.0.0:5000 wsgi:app > server.log 2>&1 &
 PID=$!
 
 # Save PID to file for easy management
@@ -3,8 +3,64 @@
 """
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+try:
+    # 파일 전체를 메모리에 올리지 않고 청크 단위로 스트리밍 전송
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
 
 BASE_URL = 'http://localhost:5000'
+TEST_DIR = '/var/www/html/vowelspace/test'
+
+def _upload(session, filename):
+    """테스트 파일 하나를 업로드하고 응답 반환"""
+    filepath = f'{TEST_DIR}/{filename}'
+    with open(filepath, 'rb') as f:
+        if MultipartEncoder is not None:
+            encoder = MultipartEncoder(fields={'viz_type': 'static', 'files': (filename, f, 'text/csv')})
+            return session.post(f'{BASE_URL}/upload', data=encoder,
+                                headers={'Content-Type': encoder.content_type})
+        
+        files = {'files': (filename, f, 'text/csv')}
+        data = {'viz_type': 'static'}
+        
+        return session.post(f'{BASE_URL}/upload', files=files, data=data)
+
+
+def _print_result(response):
+    """업로드 응답 출력"""
+    if response.status_code == 200:
+        result = response.json()
+        
+        if result.get('success'):
+            print("✅ 업로드 및 처리 성공!")
+            
+            # 데이터 요약 출력
+            summary = result.get('data_summary', {})
+            print(f"\n데이터 요약:")
+            print(f"  - 총 행: {summary.get('rows', 0)}")
+            print(f"  - 모음: {', '.join(summary.get('vowels', []))}")
+            print(f"  - 컬럼: {', '.join(summary.get('columns', []))}")
+            
+            # 컬럼 감지 정보 출력
+            if (col_detection := summary.get('column_detection')) and (details := col_detection.get('details')):
+                print(f"\n자동 감지된 컬럼:")
+                for std_name, info in details.items():
+                    print(f"  - {std_name:20} <- {info['actual_name']}")
+                    
+                    if (col_min := info.get('min')) is not None:
+                        print(f"    범위: {col_min:.0f} - {info['max']:.0f} Hz")
+                    elif (unique_count := info.get('unique_count')) is not None:
+                        print(f"    고유값: {unique_count}개")
+            
+            print("\n✨ 시각화 생성 완료!")
+        else:
+            print(f"❌ 처리 실패: {result.get('error', '알 수 없는 오류')}")
+    else:
+        print(f"❌ HTTP 오류: {response.status_code}")
+        print(f"응답: {response.text[:200]}")
+
 
 def test_upload_with_auto_detection():
     """다양한 컬럼명 형식의 파일 업로드 테스트"""
@@ -15,60 +71,25 @@ def test_upload_with_auto_detection():
         ('test_format4.csv', 'Format 4: f1, f2, v, spk'),
     ]
     
-    for filename, description in test_files:
-        print(f"\n{'='*70}")
-        print(f"테스트: {description}")
-        print(f"파일: {filename}")
-        print(f"{'='*70}")
-        
-        filepath = f'/var/www/html/vowelspace/test/{filename}'
-        
-        try:
-            with open(filepath, 'rb') as f:
-                files = {'files': (filename, f, 'text/csv')}
-                data = {'viz_type': 'static'}
-                
-                response = requests.post(f'{BASE_URL}/upload', files=files, data=data)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    if result.get('success'):
-                        print("✅ 업로드 및 처리 성공!")
-                        
-                        # 데이터 요약 출력
-                        summary = result.get('data_summary', {})
-                        print(f"\n데이터 요약:")
-                        print(f"  - 총 행: {summary.get('rows', 0)}")
-                        print(f"  - 모음: {', '.join(summary.get('vowels', []))}")
-                        print(f"  - 컬럼: {', '.join(summary.get('columns', []))}")
-                        
-                        # 컬럼 감지 정보 출력
-                        col_detection = summary.get('column_detection')
-                        if col_detection and col_detection.get('details'):
-                            print(f"\n자동 감지된 컬럼:")
-                            for std_name, info in col_detection['details'].items():
-                                actual = info['actual_name']
-                                print(f"  - {std_name:20} <- {actual}")
-                                
-                                if 'min' in info:
-                                    print(f"    범위: {info['min']:.0f} - {info['max']:.0f} Hz")
-                                elif 'unique_count' in info:
-                                    print(f"    고유값: {info['unique_count']}개")
-                        
-                        print("\n✨ 시각화 생성 완료!")
-                    else:
-                        print(f"❌ 처리 실패: {result.get('error', '알 수 없는 오류')}")
-                else:
-                    print(f"❌ HTTP 오류: {response.status_code}")
-                    print(f"응답: {response.text[:200]}")
+    # 업로드는 keep-alive 세션으로 동시에 보내고, 결과는 파일 순서대로 출력
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=len(test_files)) as executor:
+        futures = [executor.submit(_upload, session, filename) for filename, _ in test_files]
         
-        except FileNotFoundError:
-            print(f"❌ 파일을 찾을 수 없음: {filepath}")
-        except Exception as e:
-            print(f"❌ 예외 발생: {e}")
-            import traceback
-            traceback.print_exc()
+        for (filename, description), future in zip(test_files, futures):
+            print(f"\n{'='*70}")
+            print(f"테스트: {description}")
+            print(f"파일: {filename}")
+            print(f"{'='*70}")
+            
+            try:
+                _print_result(future.result())
+            
+            except FileNotFoundError:
+                print(f"❌ 파일을 찾을 수 없음: {TEST_DIR}/{filename}")
+            except Exception as e:
+                print(f"❌ 예외 발생: {e}")
+                import traceback
+                traceback.print_exc()
 
 
 def test_example_endpoint():
@@ -5,6 +5,86 @@ Intelligently detects and maps various column naming conventions to standard nam
 import pandas as pd
 import numpy as np
 import re
+from functools import lru_cache
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+try:
+    # RE2는 선형 시간 DFA 매칭 (업로드된 컬럼명에 대한 백트래킹 위험 없음)
+    import re2 as _fused_re
+except ImportError:
+    _fused_re = re
+
+
+# 이름만으로 이 컬럼들이 모두 감지되면 휴리스틱 단계를 건너뜀
+REQUIRED_FOR_FAST_PATH = frozenset({'F1', 'F2', 'vowel', 'speaker'})
+
+
+# 모음 컬럼 휴리스틱에서 쓰는 IPA 모음 기호와 영어 모음 표기
+IPA_VOWEL_CHARS = frozenset('iɪeɛæaɑɒʌɔoʊuɯʏyøœɜəɘɵɤɐ')
+ENGLISH_VOWELS = frozenset({'i', 'e', 'a', 'o', 'u', 'ih', 'eh', 'ae', 'ah', 'ao', 'uh', 'uw', 'iy', 'ey', 'ay', 'oy', 'aw', 'ow'})
+
+# 모음 컬럼의 평균 길이 검사에 쓰는 값 개수 (앞에서부터)
+VOWEL_LENGTH_SAMPLE = 1000
+
+
+def _literal_name(pattern):
+    """'^name$' 패턴이 정규식 메타문자 없는 정확한 이름이면 그 소문자 이름, 아니면 None"""
+    if pattern.startswith('^') and pattern.endswith('$'):
+        name = pattern[1:-1]
+        if name and re.escape(name) == name:
+            return name.lower()
+    return None
+
+
+def _fuse(patterns):
+    """패턴 목록을 하나의 대소문자 무시 alternation으로 컴파일 (빈 목록이면 None)"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
+
+def _fuse_named(patterns_by_name):
+    """
+    표준명마다 named group을 둔 하나의 alternation (표준명 순서대로 시도됨)
+    re2가 설치되어 있으면 re2로 컴파일 (두 엔진 모두 지원하는 인라인 (?i) 플래그 사용)
+    """
+    groups = (
+        f'(?P<{name}>' + '|'.join(f'(?:{p})' for p in patterns) + ')'
+        for name, patterns in patterns_by_name.items()
+    )
+    return _fused_re.compile('(?i)' + '|'.join(groups))
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _column_stats(values):
+        """
+        2차원 배열의 열별 min/max/mean (NaN 제외)을 한 번의 순회로 계산
+        값이 모두 NaN인 열은 세 값 모두 NaN
+        """
+        n_rows, n_cols = values.shape
+        count = np.zeros(n_cols, np.int64)
+        total = np.zeros(n_cols)
+        lo = np.full(n_cols, np.inf)
+        hi = np.full(n_cols, -np.inf)
+        for i in range(n_rows):
+            for j in range(n_cols):
+                x = values[i, j]
+                if not np.isnan(x):
+                    count[j] += 1
+                    total[j] += x
+                    lo[j] = min(lo[j], x)
+                    hi[j] = max(hi[j], x)
+        
+        stats = np.full((n_cols, 3), np.nan)
+        for j in range(n_cols):
+            if count[j] > 0:
+                stats[j, 0] = lo[j]
+                stats[j, 1] = hi[j]
+                stats[j, 2] = total[j] / count[j]
+        return stats
 
 
 class ColumnDetector:
@@ -62,6 +142,77 @@ class ColumnDetector:
         ]
     }
     
+    # 값 기반 포먼트 감지 범위 (Hz): 평균이 범위 안에 있어야 함
+    FORMANT_RANGES = {
+        'F1': (200, 1000),
+        'F2': (800, 3000),
+        'F3': (1500, 4000)
+    }
+    
+    # '^word$' 형태의 패턴은 소문자 이름 집합으로 비교 (정규식 엔진 없이 해시 조회)
+    _LITERAL_NAMES = {
+        name: frozenset(_literal_name(p) for p in pats if _literal_name(p) is not None)
+        for name, pats in PATTERNS.items()
+    }
+    
+    # 나머지 패턴은 표준 컬럼명마다 하나의 alternation으로 합쳐 클래스 정의 시 한 번만 컴파일
+    # (컬럼당 match 호출이 패턴 수만큼에서 한 번으로 줄어듦)
+    _FUSED_PATTERNS = {
+        name: _fuse([p for p in pats if _literal_name(p) is None])
+        for name, pats in PATTERNS.items()
+    }
+    
+    # 모든 표준명의 패턴을 합친 alternation: 컬럼당 match 한 번, 매칭된 표준명은 m.lastgroup
+    _FUSED_ALL = _fuse_named(PATTERNS)
+    _STANDARD_NAMES = tuple(PATTERNS)
+    
+    @staticmethod
+    def _matches_name(standard_name, col_lower):
+        """컬럼명이 특정 표준명의 패턴에 맞는지 확인"""
+        if col_lower in ColumnDetector._LITERAL_NAMES[standard_name]:
+            return True
+        pattern = ColumnDetector._FUSED_PATTERNS[standard_name]
+        return pattern is not None and pattern.match(col_lower) is not None
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _match_header(columns):
+        """
+        컬럼 이름만으로 표준명 매핑 (데이터는 보지 않으므로 헤더 튜플로 캐시)
+        
+        Returns:
+            tuple: ((표준컬럼명, 실제컬럼명), ...) - 캐시 값이 변경되지 않도록 튜플로 반환
+        """
+        detected = {}
+        # 위치로 짝지은 이름 리스트 (중복 컬럼명은 처음 것만, 기존 dict와 같은 순서)
+        names = list(dict.fromkeys(columns))
+        names_lower = [col.lower().strip() for col in names]
+        
+        # 컬럼 순서대로 아직 감지되지 않은 가장 앞선 표준명에 배정
+        # (표준명마다 첫 번째 미사용 컬럼을 고르는 방식과 결과가 같음)
+        standard_names = ColumnDetector._STANDARD_NAMES
+        for col, col_lower in zip(names, names_lower):
+            m = ColumnDetector._FUSED_ALL.match(col_lower)
+            if m is None:
+                continue
+            
+            # alternation은 표준명 순서대로 시도되므로 lastgroup 앞의 표준명은 매칭되지 않은 것
+            standard_name = m.lastgroup
+            if standard_name in detected:
+                # 이미 감지된 표준명이면 그 뒤 표준명만 개별 패턴으로 확인 (드문 경우)
+                later = standard_names[standard_names.index(standard_name) + 1:]
+                standard_name = next(
+                    (name for name in later
+                     if name not in detected and ColumnDetector._matches_name(name, col_lower)),
+                    None
+                )
+            
+            if standard_name is not None:
+                detected[standard_name] = col
+        
+        # 결과는 표준명 순서로 (감지 정보에 표시되는 순서 유지)
+        return tuple((name, detected[name]) for name in standard_names if name in detected)
+    
     @staticmethod
     def detect_columns(df):
         """
@@ -70,44 +221,25 @@ class ColumnDetector:
         Returns:
             dict: {표준컬럼명: 실제컬럼명}
         """
-        detected = {}
-        columns_lower = {col: col.lower().strip() for col in df.columns}
-        used_columns = set()  # 이미 매핑된 컬럼 추적
+        # 1단계: 패턴 매칭 (같은 헤더는 캐시된 결과 사용)
+        detected = dict(ColumnDetector._match_header(tuple(df.columns)))
+        used_columns = set(detected.values())  # 이미 매핑된 컬럼 추적
         
-        # 1단계: 패턴 매칭
-        for standard_name, patterns in ColumnDetector.PATTERNS.items():
-            for col, col_lower in columns_lower.items():
-                if col in used_columns:
-                    continue
-                    
-                # 패턴 매칭
-                for pattern in patterns:
-                    if re.match(pattern, col_lower, re.IGNORECASE):
-                        detected[standard_name] = col
-                        used_columns.add(col)
-                        break
-                
-                if standard_name in detected:
-                    break
+        # 핵심 컬럼이 모두 이름으로 감지되면 값 기반 휴리스틱(전체 컬럼 스캔)은 생략
+        if REQUIRED_FOR_FAST_PATH.issubset(detected):
+            return detected
         
         # 2단계: 패턴으로 찾지 못한 경우 휴리스틱 사용
-        if 'F1' not in detected:
-            f1_col = ColumnDetector._find_formant_by_value(df, 1, used_columns)
-            if f1_col:
-                detected['F1'] = f1_col
-                used_columns.add(f1_col)
-        
-        if 'F2' not in detected:
-            f2_col = ColumnDetector._find_formant_by_value(df, 2, used_columns)
-            if f2_col:
-                detected['F2'] = f2_col
-                used_columns.add(f2_col)
+        # 숫자 컬럼의 min/max/mean은 F1/F2/F3 검사에서 공유하도록 한 번만 계산
+        missing_formants = [name for name in ColumnDetector.FORMANT_RANGES if name not in detected]
+        if missing_formants:
+            numeric_stats = ColumnDetector._numeric_stats(df)
+            formant_cols = ColumnDetector._find_formants_by_value(numeric_stats, missing_formants, used_columns)
+            detected.update(formant_cols)
+            used_columns.update(formant_cols.values())
         
-        if 'F3' not in detected:
-            f3_col = ColumnDetector._find_formant_by_value(df, 3, used_columns)
-            if f3_col:
-                detected['F3'] = f3_col
-                used_columns.add(f3_col)
+        # 텍스트 컬럼의 고유값 개수는 vowel/speaker 검사에서 공유
+        text_nunique = {}
         
         # time 컬럼 휴리스틱 검사
         if 'time' not in detected:
@@ -118,14 +250,14 @@ class ColumnDetector:
         
         # vowel 컬럼 휴리스틱 검사
         if 'vowel' not in detected:
-            vowel_col = ColumnDetector._find_vowel_column(df, used_columns)
+            vowel_col = ColumnDetector._find_vowel_column(df, used_columns, text_nunique)
             if vowel_col:
                 detected['vowel'] = vowel_col
                 used_columns.add(vowel_col)
         
         # speaker 컬럼 휴리스틱 검사
         if 'speaker' not in detected:
-            speaker_col = ColumnDetector._find_categorical_column(df, max_unique=50, used_columns=used_columns)
+            speaker_col = ColumnDetector._find_categorical_column(df, max_unique=50, used_columns=used_columns, text_nunique=text_nunique)
             if speaker_col:
                 detected['speaker'] = speaker_col
                 used_columns.add(speaker_col)
@@ -133,105 +265,137 @@ class ColumnDetector:
         return detected
     
     @staticmethod
-    def _find_formant_by_value(df, formant_num, used_columns):
-        """값의 범위로 포먼트 컬럼 찾기"""
-        # F1: 200-1000 Hz, F2: 800-3000 Hz, F3: 1500-4000 Hz
-        ranges = {
-            1: (200, 1000),
-            2: (800, 3000),
-            3: (1500, 4000)
-        }
+    def _numeric_stats(df):
+        """숫자 컬럼별 min/max/mean (NaN 제외)을 한 번의 집계로 계산"""
+        numeric = df.select_dtypes(include='number')
+        if njit is not None and numeric.shape[1] > 0:
+            # 세 번의 pandas 집계 대신 numba 커널 한 번
+            values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+            return pd.DataFrame(_column_stats(values), index=numeric.columns, columns=['min', 'max', 'mean'])
+        return numeric.agg(['min', 'max', 'mean']).T
+    
+    @staticmethod
+    def _find_formants_by_value(numeric_stats, formant_names, used_columns):
+        """
+        값의 범위로 포먼트 컬럼 찾기 (numeric_stats: _numeric_stats 결과)
         
-        min_val, max_val = ranges.get(formant_num, (0, 10000))
+        Returns:
+            dict: {포먼트명: 실제컬럼명} (찾은 포먼트만)
+        """
+        if numeric_stats.empty:
+            return {}
         
-        for col in df.columns:
-            if col in used_columns:
-                continue
-                
-            if pd.api.types.is_numeric_dtype(df[col]):
-                # NaN이 아닌 값들만 사용
-                non_null_values = df[col].dropna()
-                if len(non_null_values) == 0:
-                    continue
-                
-                col_min = non_null_values.min()
-                col_max = non_null_values.max()
-                col_mean = non_null_values.mean()
-                
-                # 값의 범위가 포먼트 범위와 일치하는지 확인
-                if min_val <= col_mean <= max_val:
-                    if col_min >= min_val * 0.5 and col_max <= max_val * 1.5:
-                        return col
+        lo = np.array([ColumnDetector.FORMANT_RANGES[name][0] for name in formant_names], dtype=np.float64)
+        hi = np.array([ColumnDetector.FORMANT_RANGES[name][1] for name in formant_names], dtype=np.float64)
+        col_min, col_max, col_mean = (
+            numeric_stats[stat].to_numpy(dtype=np.float64)[:, None] for stat in ('min', 'max', 'mean')
+        )
         
-        return None
+        # (컬럼 수, 포먼트 수) 판정 행렬: 평균이 포먼트 범위 안이고 min/max도 범위에서 크게 벗어나지 않음
+        # 값이 모두 NaN인 컬럼은 통계도 NaN이므로 비교 결과가 False
+        fits = (lo <= col_mean) & (col_mean <= hi) & (col_min >= lo * 0.5) & (col_max <= hi * 1.5)
+        
+        # F1부터 차례로 아직 쓰이지 않은 첫 번째 후보 컬럼을 배정
+        columns = numeric_stats.index
+        taken = np.fromiter((col in used_columns for col in columns), dtype=bool, count=len(columns))
+        found = {}
+        for j, name in enumerate(formant_names):
+            candidates = np.flatnonzero(fits[:, j] & ~taken)
+            if candidates.size:
+                found[name] = columns[candidates[0]]
+                taken[candidates[0]] = True
+        
+        return found
     
     @staticmethod
     def _find_time_column(df, used_columns):
         """시간 컬럼 찾기 (숫자이고 순차적으로 증가)"""
-        for col in df.columns:
+        # dtype 검사는 df.dtypes로 하고 숫자 컬럼만 Series로 꺼냄
+        for col, dtype in df.dtypes.items():
             if col in used_columns:
                 continue
                 
-            if pd.api.types.is_numeric_dtype(df[col]):
-                non_null_values = df[col].dropna()
-                if len(non_null_values) == 0:
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                non_null_values = values[~np.isnan(values)]
+                if non_null_values.size == 0:
                     continue
                 
                 # 값이 0 이상이고 작은 값 (보통 초 단위)
                 if non_null_values.min() >= 0 and non_null_values.max() < 10000:
                     # 값이 순차적으로 증가하는지 확인 (대부분이 양수 차이)
-                    diffs = df[col].diff().dropna()
-                    if len(diffs) > 0:
-                        positive_ratio = (diffs >= 0).sum() / len(diffs)
+                    # NaN이 끼어 있는 차이는 Series.diff().dropna()처럼 제외
+                    diffs = np.diff(values)
+                    valid_count = np.count_nonzero(~np.isnan(diffs))
+                    if valid_count > 0:
+                        positive_ratio = np.count_nonzero(diffs >= 0) / valid_count
                         if positive_ratio > 0.8:  # 80% 이상이 증가
                             return col
         
         return None
     
     @staticmethod
-    def _find_vowel_column(df, used_columns):
+    def _text_nunique(df, col, cache):
+        """텍스트 컬럼이면 고유값 개수, 아니면 None (cache에 컬럼당 한 번만 계산)"""
+        if col not in cache:
+            series = df[col]
+            is_text = series.dtype == 'object' or pd.api.types.is_string_dtype(series)
+            cache[col] = series.nunique() if is_text else None
+        return cache[col]
+    
+    @staticmethod
+    def _find_vowel_column(df, used_columns, text_nunique=None):
         """모음 컬럼 찾기 (문자열이고 짧은 값)"""
+        if text_nunique is None:
+            text_nunique = {}
         for col in df.columns:
             if col in used_columns:
                 continue
-                
-            if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
+            
+            unique_count = ColumnDetector._text_nunique(df, col, text_nunique)
+            if unique_count is not None:
                 # 고유값 개수가 적고 (보통 모음은 5-30개)
-                unique_count = df[col].nunique()
                 if 2 <= unique_count <= 30:
                     # 대부분의 값이 1-5글자
                     non_null = df[col].dropna()
                     if len(non_null) == 0:
                         continue
                     
-                    avg_length = non_null.astype(str).str.len().mean()
-                    if avg_length <= 8:
+                    # 평균 길이 8 이하인지 앞쪽 일부 값만 보고 판단 (길이 Series를 만들지 않음)
+                    sample = non_null.to_numpy()[:VOWEL_LENGTH_SAMPLE]
+                    length_limit = 8 * len(sample)
+                    total_length = 0
+                    for val in sample:
+                        total_length += len(val) if isinstance(val, str) else len(str(val))
+                        if total_length > length_limit:
+                            break
+                    
+                    if total_length <= length_limit:
                         # IPA 모음 기호 포함 여부 확인
-                        sample_values = non_null.unique()[:10]
-                        vowel_chars = set('iɪeɛæaɑɒʌɔoʊuɯʏyøœɜəɘɵɤɐ')
+                        sample_values = [str(val).lower() for val in non_null.unique()[:10]]
                         
                         for val in sample_values:
-                            if any(char in vowel_chars for char in str(val).lower()):
+                            if not IPA_VOWEL_CHARS.isdisjoint(val):
                                 return col
                         
                         # 영어 모음 표기도 확인
-                        english_vowels = {'i', 'e', 'a', 'o', 'u', 'ih', 'eh', 'ae', 'ah', 'ao', 'uh', 'uw', 'iy', 'ey', 'ay', 'oy', 'aw', 'ow'}
-                        if any(str(val).lower() in english_vowels for val in sample_values):
+                        if any(val in ENGLISH_VOWELS for val in sample_values):
                             return col
         
         return None
     
     @staticmethod
-    def _find_categorical_column(df, max_unique=50, used_columns=set()):
+    def _find_categorical_column(df, max_unique=50, used_columns=set(), text_nunique=None):
         """카테고리형 컬럼 찾기 (화자, 언어 등)"""
+        if text_nunique is None:
+            text_nunique = {}
         for col in df.columns:
             if col in used_columns:
                 continue
-                
-            if df[col].dtype == 'object' or pd.api.types.is_string_dtype(df[col]):
-                unique_count = df[col].nunique()
-                if 2 <= unique_count <= max_unique:
-                    return col
+            
+            unique_count = ColumnDetector._text_nunique(df, col, text_nunique)
+            if unique_count is not None and 2 <= unique_count <= max_unique:
+                return col
         
         return None
     
@@ -302,21 +466,34 @@ class ColumnDetector:
         return info
 
 
-def auto_detect_and_rename(df):
+def auto_detect_and_rename(df, sample_rows=None):
     """
     데이터프레임의 컬럼을 자동 감지하고 표준 이름으로 변경
     
+    Args:
+        df: 원본 데이터프레임
+        sample_rows: 지정하면 값 기반 휴리스틱을 처음 sample_rows 행에만 적용
+            (감지 비용이 파일 크기와 무관해짐; 감지 정보와 이름 변경은 전체 데이터 사용)
+    
     Returns:
         tuple: (변경된 df, 감지 정보)
     """
     detector = ColumnDetector()
     
     # 컬럼 감지
-    detected = detector.detect_columns(df)
+    sample = df if sample_rows is None else df.head(sample_rows)
+    detected = detector.detect_columns(sample)
     
     # 필수 컬럼 검증
     detector.validate_required_columns(detected)
     
+    # 모음 컬럼은 이후 처리에서 어차피 범주형이 되므로 여기서 한 번만 해시해 두면
+    # 아래 get_column_info의 nunique/unique가 정수 코드로 계산됨
+    vowel_col = detected.get('vowel')
+    if vowel_col is not None and not pd.api.types.is_numeric_dtype(df[vowel_col]):
+        df = df.copy(deep=False)
+        df[vowel_col] = df[vowel_col].astype('category')
+    
     # 정보 수집 (이름 변경 전에)
     info = detector.get_column_info(df, detected)
     
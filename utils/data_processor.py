@@ -6,11 +6,20 @@ import numpy as np
 import os
 import re
 import unicodedata
+import traceback
+from functools import lru_cache
+from math import gcd
+from scipy.signal import resample_poly
 try:
     import parselmouth
     from parselmouth.praat import call
 except ImportError:
     parselmouth = None
+try:
+    # Lets parselmouth hand a whole TextGrid to Python in one conversion
+    import tgt
+except ImportError:
+    tgt = None
 
 from .column_detector import auto_detect_and_rename, ColumnDetector
 
@@ -18,21 +27,46 @@ from .column_detector import auto_detect_and_rename, ColumnDetector
 # ----------------------------
 # Vowel label utilities
 # ----------------------------
-ARPABET_VOWELS = {
+ARPABET_VOWELS = frozenset({
     'AA','AE','AH','AO','AW','AY','EH','ER','EY','IH','IY','OW','OY','UH','UW','UX'
-}
+})
 
 # IPA vowel characters set (lowercase) for quick membership tests
-IPA_VOWEL_CHARS = set(
+IPA_VOWEL_CHARS = frozenset(
     list('aeiouy') + list('ɪʊəɚɝɜɞʌɔɑæɒɛøœɶɨɯʏɐɤɵ') + list('iu y')
 )
 
-def _strip_diacritics(s: str) -> str:
+# Tier names that hold the vowel labels
+_VOWEL_TIER_RE = re.compile(r'vowel|phone|segment', re.IGNORECASE)
+
+# Compiled once; is_vowel_label runs for every TextGrid interval
+_PROSODIC_MARKS = str.maketrans('', '', 'ˈˌː:')
+_DIGIT_RE = re.compile(r'\d')
+_NON_VOWEL_RE = re.compile(r"[^A-Za-zɪʊəɚɝɜɞʌɔɑæɒɛøœɶɨɯʏɐɤɵ]")
+
+def _strip_marks_nfd(s: str) -> str:
     return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
 
+# Precomposed Latin-1 / Latin Extended-A letters (é, ü, ŏ, ...) folded to their base
+# letters in a single translate pass
+_FOLD_TABLE = str.maketrans({
+    c: _strip_marks_nfd(c) for c in map(chr, range(0xC0, 0x180)) if _strip_marks_nfd(c) != c
+})
+
+def _strip_diacritics(s: str) -> str:
+    s = s.translate(_FOLD_TABLE)
+    if s.isascii():
+        return s
+    # IPA symbols or combining marks left: full decomposition
+    return _strip_marks_nfd(s)
+
+@lru_cache(maxsize=4096)
 def is_vowel_label(label: str) -> bool:
     """Return True if a label looks like a vowel phone (ARPABET or IPA).
 
+    Results are memoized: labels come from a small phone inventory and repeat
+    across intervals and files.
+
     Handles:
     - ARPABET with stress digits (e.g., AH0, IY1)
     - IPA with length marks (:, ː) and stress marks (ˈ, ˌ)
@@ -44,16 +78,18 @@ def is_vowel_label(label: str) -> bool:
     if not s:
         return False
     # Remove common prosodic marks and length marks
-    s = s.replace('ˈ', '').replace('ˌ', '').replace('ː', '').replace(':', '')
-    s = _strip_diacritics(s)
+    s = s.translate(_PROSODIC_MARKS)
+    # ASCII labels (ARPABET, romanized vowels) have no diacritics to strip
+    if not s.isascii():
+        s = _strip_diacritics(s)
 
     # Check ARPABET (uppercase, remove digits)
-    arp = re.sub(r'\d', '', s.upper())
+    arp = _DIGIT_RE.sub('', s.upper())
     if arp in ARPABET_VOWELS:
         return True
 
     # Check IPA/roman vowels: keep only letters and IPA vowel symbols
-    cleaned = re.sub(r"[^A-Za-zɪʊəɚɝɜɞʌɔɑæɒɛøœɶɨɯʏɐɤɵ]", '', s)
+    cleaned = _NON_VOWEL_RE.sub('', s)
     cleaned = cleaned.lower()
     if cleaned and all(ch in IPA_VOWEL_CHARS for ch in cleaned):
         return True
@@ -61,6 +97,91 @@ def is_vowel_label(label: str) -> bool:
     return False
 
 
+try:
+    import pyarrow  # noqa: F401 - only needed as the pd.read_csv engine
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Column auto-detection only inspects this many leading rows; the header decides
+# most mappings and value heuristics do not need the whole file
+DETECTION_SAMPLE_ROWS = 1000
+
+
+def _read_first_line(source):
+    """Return the raw first line of a path or binary file object, leaving the object rewound"""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return f.readline()
+    source.seek(0)
+    first_line = source.readline()
+    source.seek(0)
+    return first_line
+
+
+def _has_binary_column(df):
+    """True if a column holds bytes (pyarrow's result for text that is not valid UTF-8)"""
+    for col in df.select_dtypes(include='object'):
+        values = df[col].dropna()
+        if len(values) and isinstance(values.iloc[0], bytes):
+            return True
+    return False
+
+
+def _read_csv(source, **kwargs):
+    """
+    pd.read_csv using the multi-threaded pyarrow parser when it is installed
+    pyarrow returns bytes columns instead of failing on text that is not valid
+    UTF-8, and rejects some inputs the C parser accepts, so those files are
+    re-read with the C parser (which raises UnicodeDecodeError as before)
+    """
+    if CSV_ENGINE == 'pyarrow' and kwargs.get('encoding', 'utf-8') == 'utf-8':
+        try:
+            df = pd.read_csv(source, engine='pyarrow', **kwargs)
+            if not _has_binary_column(df):
+                return df
+        except ValueError:
+            # e.g. header-only or ragged files; let the C parser decide as before
+            pass
+        if not isinstance(source, str):
+            source.seek(0)
+    return pd.read_csv(source, **kwargs)
+
+
+def _read_table(source, ext):
+    """
+    Read a CSV, TXT, or XLSX table into a DataFrame
+    
+    Args:
+        source: Path to the file or a seekable binary file object
+        ext: Lowercase file extension without the dot
+    """
+    if ext == 'csv':
+        return _read_csv(source)
+    if ext == 'txt':
+        # Detect separator (tab or comma) once from the raw first line; a tab byte
+        # is the same in both encodings tried below
+        sep = '\t' if b'\t' in _read_first_line(source) else ','
+        # Fall back to latin-1 for files that are not UTF-8
+        for encoding in ('utf-8', 'latin-1'):
+            try:
+                return _read_csv(source, sep=sep, encoding=encoding)
+            except UnicodeDecodeError:
+                if encoding == 'latin-1':
+                    raise
+                if not isinstance(source, str):
+                    source.seek(0)
+    # Rust-backed reader; much faster and leaner than openpyxl for .xlsx/.xls
+    try:
+        return pd.read_excel(source, engine='calamine')
+    except ImportError:
+        # python-calamine not installed: pandas' default readers (openpyxl for .xlsx,
+        # which pandas already opens read-only with cached values; xlrd for .xls)
+        if not isinstance(source, str):
+            source.seek(0)
+        return pd.read_excel(source, engine='openpyxl' if ext == 'xlsx' else None)
+
+
 def process_csv_xlsx(filepath, auto_detect=True):
     """
     Process CSV, TXT, or XLSX files containing formant data
@@ -74,34 +195,36 @@ def process_csv_xlsx(filepath, auto_detect=True):
     Returns:
         DataFrame with standardized column names, or tuple (DataFrame, detection_info) if auto_detect=True
     """
+    ext = filepath.rsplit('.', 1)[-1].lower()
+    return _process_table(filepath, ext, auto_detect)
+
+
+def process_csv_xlsx_stream(fileobj, ext, auto_detect=True):
+    """
+    Process an uploaded CSV, TXT, or XLSX file without writing it to disk
+    
+    Args:
+        fileobj: Seekable binary file object (e.g. an upload's stream)
+        ext: Lowercase file extension without the dot ('csv', 'txt', 'xlsx', 'xls')
+        auto_detect: If True, automatically detect and rename columns
+    
+    Returns:
+        Same as process_csv_xlsx
+    """
+    fileobj.seek(0)
+    return _process_table(fileobj, ext, auto_detect)
+
+
+def _process_table(source, ext, auto_detect):
+    """Shared implementation of process_csv_xlsx and process_csv_xlsx_stream"""
     try:
-        if filepath.endswith('.csv'):
-            df = pd.read_csv(filepath)
-        elif filepath.endswith('.txt'):
-            # Try to detect separator (tab or comma)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    first_line = f.readline()
-                    if '\t' in first_line:
-                        df = pd.read_csv(filepath, sep='\t', encoding='utf-8')
-                    else:
-                        df = pd.read_csv(filepath, sep=',', encoding='utf-8')
-            except UnicodeDecodeError:
-                # Try different encoding
-                with open(filepath, 'r', encoding='latin-1') as f:
-                    first_line = f.readline()
-                    if '\t' in first_line:
-                        df = pd.read_csv(filepath, sep='\t', encoding='latin-1')
-                    else:
-                        df = pd.read_csv(filepath, sep=',', encoding='latin-1')
-        else:
-            df = pd.read_excel(filepath)
+        df = _read_table(source, ext)
         
         detection_info = None
         
         if auto_detect:
             # 자동 컬럼 감지 및 이름 변경
-            df, detection_info = auto_detect_and_rename(df)
+            df, detection_info = auto_detect_and_rename(df, sample_rows=DETECTION_SAMPLE_ROWS)
             print(f"Auto-detected columns: {detection_info['detected']}")
         else:
             # 기존 방식: 소문자로 정규화
@@ -121,15 +244,16 @@ def process_csv_xlsx(filepath, auto_detect=True):
             # Rename to uppercase for consistency
             df = df.rename(columns={'f1': 'F1', 'f2': 'F2'})
         
-        # Clean data
-        df = df.dropna(subset=['F1', 'F2'])
-        df['F1'] = pd.to_numeric(df['F1'], errors='coerce')
-        df['F2'] = pd.to_numeric(df['F2'], errors='coerce')
-        df = df.dropna(subset=['F1', 'F2'])
+        # Clean data; columns read as numbers (the usual case) skip the coercion pass
+        for col in ('F1', 'F2'):
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
         
-        # Filter reasonable formant values (100-4000 Hz)
-        df = df[(df['F1'] >= 100) & (df['F1'] <= 4000)]
-        df = df[(df['F2'] >= 100) & (df['F2'] <= 4000)]
+        # Filter reasonable formant values (100-4000 Hz) with one mask;
+        # missing values compare False and are dropped with them
+        f1 = df['F1'].to_numpy(dtype=np.float64, na_value=np.nan)
+        f2 = df['F2'].to_numpy(dtype=np.float64, na_value=np.nan)
+        df = df[(f1 >= 100) & (f1 <= 4000) & (f2 >= 100) & (f2 <= 4000)]
         
         # Ensure vowel column exists
         if 'vowel' not in df.columns:
@@ -138,6 +262,11 @@ def process_csv_xlsx(filepath, auto_detect=True):
         if df.empty:
             raise ValueError("유효한 데이터가 없습니다. F1과 F2 값이 100-4000 Hz 범위에 있는지 확인하세요.")
         
+        # Finite vowel inventory: categorical storage is smaller and groups faster
+        # (detection may already have made it categorical; drop vowels filtered out above
+        # so the categories stay the observed inventory)
+        df = df.assign(vowel=df['vowel'].astype('category').cat.remove_unused_categories())
+        
         print(f"Successfully processed {len(df)} rows")  # Debug log
         
         if auto_detect and detection_info:
@@ -146,23 +275,120 @@ def process_csv_xlsx(filepath, auto_detect=True):
     
     except Exception as e:
         print(f"Error processing CSV/XLSX/TXT: {e}")
-        import traceback
         print(traceback.format_exc())
         if auto_detect:
             return pd.DataFrame(), None
         return pd.DataFrame()
 
 
-def process_wav_textgrid(wav_files, textgrid_files=None):
+def resample_sound(sound, target_rate):
+    """
+    Resample a parselmouth Sound with a polyphase FIR filter
+    Much cheaper than Praat's sinc resampling at precision 50 and ample for formant
+    analysis below 5.5 kHz; non-integer source rates still go through Praat
+    """
+    original_rate = sound.sampling_frequency
+    if original_rate != int(original_rate):
+        return sound.resample(target_rate, precision=50)
+    
+    g = gcd(int(original_rate), target_rate)
+    values = resample_poly(sound.values, target_rate // g, int(original_rate) // g, axis=1, window=('kaiser', 8.0))
+    return parselmouth.Sound(values, sampling_frequency=target_rate, start_time=sound.xmin)
+
+
+def extract_one(wav_file, textgrid_file=None):
+    """
+    Extract formant rows from a single WAV file, using textgrid_file (the TextGrid
+    with the same basename, if any) for labeled intervals
+    Defined at module level so it can be submitted to a process pool
+    
+    Returns:
+        tuple (columns, file_info, processing_info): columns maps column names to
+        per-row lists; file_info is None if the file failed
+    """
+    processing_info = []
+    try:
+        # Extract metadata from filename
+        basename = os.path.splitext(os.path.basename(wav_file))[0]
+        
+        # Try to extract speaker and language from filename patterns
+        # Common patterns: speaker_language_*, language_speaker_*, etc.
+        file_metadata = extract_metadata_from_filename(basename)
+        
+        # Load sound file
+        sound = parselmouth.Sound(wav_file)
+        
+        # Check and resample to 16000 Hz if needed
+        original_sampling_rate = sound.sampling_frequency
+        target_sampling_rate = 16000
+        
+        if original_sampling_rate != target_sampling_rate:
+            print(f"Resampling {basename} from {original_sampling_rate} Hz to {target_sampling_rate} Hz")
+            sound = resample_sound(sound, target_sampling_rate)
+            processing_info.append(
+                f"  ↻ Resampled from {original_sampling_rate} Hz to {target_sampling_rate} Hz"
+            )
+        else:
+            print(f"{basename}: Already at {target_sampling_rate} Hz")
+        
+        # Read the corresponding TextGrid if available
+        textgrid = None
+        if textgrid_file:
+            try:
+                textgrid = read_textgrid(textgrid_file)
+            except Exception as e:
+                print(f"Error reading TextGrid {textgrid_file}: {e}")
+        
+        # Extract formants
+        formant = sound.to_formant_burg(
+            time_step=0.01,
+            max_number_of_formants=5,
+            maximum_formant=5500.0,
+            window_length=0.025,
+            pre_emphasis_from=50.0
+        )
+        
+        # If TextGrid is available, extract formants at labeled intervals
+        if textgrid:
+            file_data = extract_formants_from_textgrid(sound, formant, textgrid, file_metadata, basename)
+        else:
+            file_data = extract_formants_regular(formant, sound.duration, file_metadata, basename)
+        
+        vowel_count = len(file_data['vowel'])
+        file_info = {
+            'wav_file': os.path.basename(wav_file),
+            'textgrid_file': os.path.basename(textgrid_file) if textgrid_file else None,
+            'basename': basename,
+            'duration': sound.duration,
+            'original_sampling_rate': original_sampling_rate,
+            'final_sampling_rate': sound.sampling_frequency,
+            'was_resampled': original_sampling_rate != target_sampling_rate,
+            'vowels_extracted': vowel_count,
+            **file_metadata
+        }
+        processing_info.append(f"✓ {basename}: {vowel_count} vowels")
+        return file_data, file_info, processing_info
+    
+    except Exception as e:
+        error_msg = f"✗ {os.path.basename(wav_file)}: {str(e)}"
+        print(f"Error processing {wav_file}: {e}")
+        processing_info.append(error_msg)
+        return {}, None, processing_info
+
+
+def process_wav_textgrid(wav_files, textgrid_files=None, executor=None):
     """
     Process WAV files and optional TextGrid files to extract formant data
     Returns a tuple: (DataFrame with F1, F2, vowel labels, and time information, metadata dict)
+    
+    Files are independent, so when an executor is given and there is more than one
+    WAV file they are extracted in parallel (results keep the input order)
     """
     if parselmouth is None:
         print("Parselmouth not installed. Cannot process audio files.")
         return pd.DataFrame(), None
     
-    all_data = []
+    file_frames = []
     metadata = {
         'files': [],
         'total_vowels_extracted': 0,
@@ -170,103 +396,48 @@ def process_wav_textgrid(wav_files, textgrid_files=None):
         'processing_info': []
     }
     
-    for wav_file in wav_files:
-        try:
-            # Extract metadata from filename
-            basename = os.path.splitext(os.path.basename(wav_file))[0]
-            
-            # Try to extract speaker and language from filename patterns
-            # Common patterns: speaker_language_*, language_speaker_*, etc.
-            file_metadata = extract_metadata_from_filename(basename)
-            
-            # Load sound file
-            sound = parselmouth.Sound(wav_file)
-            
-            # Check and resample to 16000 Hz if needed
-            original_sampling_rate = sound.sampling_frequency
-            target_sampling_rate = 16000
-            
-            if original_sampling_rate != target_sampling_rate:
-                print(f"Resampling {basename} from {original_sampling_rate} Hz to {target_sampling_rate} Hz")
-                sound = sound.resample(target_sampling_rate, precision=50)
-                metadata['processing_info'].append(
-                    f"  ↻ Resampled from {original_sampling_rate} Hz to {target_sampling_rate} Hz"
-                )
-            else:
-                print(f"{basename}: Already at {target_sampling_rate} Hz")
-            
-            # Find corresponding TextGrid if available
-            textgrid = None
-            textgrid_file = None
-            if textgrid_files:
-                base_name = os.path.splitext(wav_file)[0]
-                basename_only = os.path.basename(base_name)
-                for tg_file in textgrid_files:
-                    tg_base = os.path.splitext(os.path.basename(tg_file))[0]
-                    if basename_only == tg_base:
-                        textgrid_file = tg_file
-                        break
-                
-                if textgrid_file:
-                    try:
-                        textgrid = parselmouth.read(textgrid_file)
-                    except Exception as e:
-                        print(f"Error reading TextGrid {textgrid_file}: {e}")
-            
-            # Extract formants
-            formant = sound.to_formant_burg(
-                time_step=0.01,
-                max_number_of_formants=5,
-                maximum_formant=5500.0,
-                window_length=0.025,
-                pre_emphasis_from=50.0
-            )
-            
-            # If TextGrid is available, extract formants at labeled intervals
-            file_data = []
-            if textgrid:
-                file_data = extract_formants_from_textgrid(sound, formant, textgrid, file_metadata, basename)
-            else:
-                file_data = extract_formants_regular(formant, sound.duration, file_metadata, basename)
-            
-            # Track statistics
-            vowel_count = len(file_data)
-            metadata['files'].append({
-                'wav_file': os.path.basename(wav_file),
-                'textgrid_file': os.path.basename(textgrid_file) if textgrid_file else None,
-                'basename': basename,
-                'duration': sound.duration,
-                'original_sampling_rate': original_sampling_rate,
-                'final_sampling_rate': sound.sampling_frequency,
-                'was_resampled': original_sampling_rate != target_sampling_rate,
-                'vowels_extracted': vowel_count,
-                **file_metadata
-            })
-            
-            metadata['total_vowels_extracted'] += vowel_count
-            
-            # Count vowels
-            for item in file_data:
-                vowel = item.get('vowel', 'unknown')
-                metadata['vowel_counts'][vowel] = metadata['vowel_counts'].get(vowel, 0) + 1
-            
-            all_data.extend(file_data)
-            metadata['processing_info'].append(f"✓ {basename}: {vowel_count} vowels")
-        
-        except Exception as e:
-            error_msg = f"✗ {os.path.basename(wav_file)}: {str(e)}"
-            print(f"Error processing {wav_file}: {e}")
-            metadata['processing_info'].append(error_msg)
+    # Pair each WAV with its TextGrid by basename once (first match wins), so
+    # workers only receive the one path they need
+    textgrid_by_name = {}
+    for tg_file in textgrid_files or ():
+        textgrid_by_name.setdefault(os.path.splitext(os.path.basename(tg_file))[0], tg_file)
+    paired_textgrids = [
+        textgrid_by_name.get(os.path.splitext(os.path.basename(wav_file))[0])
+        for wav_file in wav_files
+    ]
+    
+    if executor is not None and len(wav_files) > 1:
+        results = executor.map(extract_one, wav_files, paired_textgrids)
+    else:
+        results = map(extract_one, wav_files, paired_textgrids)
+    
+    for file_data, file_info, processing_info in results:
+        metadata['processing_info'].extend(processing_info)
+        if file_info is None:
             continue
+        
+        # Track statistics
+        metadata['files'].append(file_info)
+        metadata['total_vowels_extracted'] += file_info['vowels_extracted']
+        
+        # Count vowels
+        for vowel in file_data['vowel']:
+            metadata['vowel_counts'][vowel] = metadata['vowel_counts'].get(vowel, 0) + 1
+        
+        if file_info['vowels_extracted']:
+            # Columnar per-file frames; concat fills metadata columns missing from some files with NaN
+            file_frames.append(pd.DataFrame(file_data))
     
-    if not all_data:
+    if not file_frames:
         return pd.DataFrame(), metadata
     
-    df = pd.DataFrame(all_data)
+    df = pd.concat(file_frames, ignore_index=True)
     
-    # Keep only vowel-labeled rows
+    # Keep only vowel-labeled rows; labels repeat a lot, so classify each distinct one once
     if 'vowel' in df.columns:
-        df = df[df['vowel'].apply(is_vowel_label)]
+        vowels = df['vowel']
+        is_vowel = {label: is_vowel_label(label) for label in vowels.unique()}
+        df = df[vowels.map(is_vowel).to_numpy(dtype=bool)]
     
     # Ensure required columns exist
     if 'speaker' not in df.columns:
@@ -275,18 +446,10 @@ def process_wav_textgrid(wav_files, textgrid_files=None):
         df['native_language'] = 'unknown'
 
     # Normalize speaker and language fields so grouping logic never sees NaN/None
-    df['speaker'] = (
-        df['speaker']
-        .fillna('unknown')
-        .replace('', 'unknown')
-        .astype(str)
-    )
-    df['native_language'] = (
-        df['native_language']
-        .fillna('unknown')
-        .replace('', 'unknown')
-        .astype(str)
-    )
+    metadata_columns = ['speaker', 'native_language']
+    df[metadata_columns] = df[metadata_columns].fillna('unknown').replace('', 'unknown').astype(str)
+    if 'vowel' in df.columns:
+        df['vowel'] = df['vowel'].astype('category')
     
     return df, metadata
 
@@ -300,10 +463,18 @@ def extract_metadata_from_filename(basename):
     - speaker-language-*
     - just_speaker
     """
-    metadata = {
-        'speaker': None,
-        'native_language': None
+    speaker, native_language = _parse_filename(basename)
+    return {
+        'speaker': speaker,
+        'native_language': native_language
     }
+
+
+@lru_cache(maxsize=4096)
+def _parse_filename(basename):
+    """(speaker, native_language) for a basename; cached as an immutable tuple"""
+    speaker = None
+    native_language = None
     
     # Split by common delimiters
     parts = basename.replace('-', '_').replace('.', '_').split('_')
@@ -311,144 +482,206 @@ def extract_metadata_from_filename(basename):
     # Try to identify speaker and language
     if len(parts) >= 2:
         # Assume first two parts might be speaker and language
-        metadata['speaker'] = parts[0]
-        metadata['native_language'] = parts[1]
+        speaker = parts[0]
+        native_language = parts[1]
     elif len(parts) == 1:
-        metadata['speaker'] = parts[0]
+        speaker = parts[0]
     
     # If no metadata found, use basename as speaker
-    if not metadata['speaker']:
-        metadata['speaker'] = basename
+    if not speaker:
+        speaker = basename
     
-    return metadata
+    return speaker, native_language
 
 
-def extract_formants_from_textgrid(sound, formant, textgrid, file_metadata, basename):
-    """Extract formants at labeled vowel intervals from TextGrid"""
-    data = []
+def formant_sampler(formant):
+    """
+    Build a function times -> (F1, F2) arrays for a Praat Formant object
+
+    The F1 and F2 tracks are pulled once with "To Matrix" and then read in NumPy
+    with the same rules as Praat's "Get value at time" (hertz, linear): the nearest
+    frame decides whether a value is defined, an undefined or missing neighbour
+    falls back to the nearest frame, and times outside the domain are NaN.
+    This replaces two Praat calls per time point with two calls per file.
+    """
+    tracks = [call(formant, "To Matrix", formant_number) for formant_number in (1, 2)]
+    # To Matrix writes 0 where a frame has fewer formants; Praat treats those as undefined
+    values = np.vstack([track.values[0] for track in tracks]).astype(np.float64)
+    values[values <= 0] = np.nan
+    x1, dx, nx = tracks[0].x1, tracks[0].dx, tracks[0].nx
+    xmin, xmax = tracks[0].xmin, tracks[0].xmax
+
+    def sample(times):
+        times = np.asarray(times, dtype=np.float64)
+        if nx == 0:
+            empty = np.full(times.shape, np.nan)
+            return empty, empty.copy()
+
+        position = (times - x1) / dx
+        left = np.floor(position).astype(np.int64)
+        phase = position - left
+        near_is_left = phase < 0.5
+        near = np.where(near_is_left, left, left + 1)
+        far = np.where(near_is_left, left + 1, left)
+        phase = np.where(near_is_left, phase, 1.0 - phase)
+
+        near_values = values[:, np.clip(near, 0, nx - 1)]
+        far_values = values[:, np.clip(far, 0, nx - 1)]
+        far_ok = (far >= 0) & (far < nx) & ~np.isnan(far_values)
+        far_values = np.where(far_ok, far_values, near_values)
+
+        result = near_values + phase * (far_values - near_values)
+        result[:, (times < xmin) | (times > xmax) | (near < 0) | (near >= nx)] = np.nan
+        return result[0], result[1]
+
+    return sample
+
+
+def read_textgrid(textgrid_file):
+    """
+    Load a TextGrid file; with tgt installed it is parsed in Python and a tgt
+    TextGrid is returned, otherwise (or for files tgt cannot read, e.g. UTF-16
+    grids saved by Praat) Praat parses it
+    """
+    if tgt is not None:
+        try:
+            return tgt.io.read_textgrid(textgrid_file)
+        except Exception:
+            return parselmouth.read(textgrid_file).to_tgt()
+    return parselmouth.read(textgrid_file)
+
+
+def vowel_tier_intervals(textgrid):
+    """
+    (label, start, end) for the labeled intervals of the tier holding the vowels:
+    the first tier whose name mentions vowel/phone/segment, otherwise the first tier
     
-    try:
+    With tgt installed textgrid is a tgt TextGrid (see read_textgrid) whose
+    intervals are plain Python objects; otherwise it is queried through Praat
+    """
+    if tgt is not None:
+        tiers = textgrid.tiers
+        tier_names = [tier.name for tier in tiers]
+    else:
         # Get the number of tiers and their names using Praat calls
         n_tiers = int(call(textgrid, "Get number of tiers"))
         tier_names = [call(textgrid, "Get tier name", i) for i in range(1, n_tiers + 1)]
-        vowel_tier_idx = 1  # Default to first tier
-        
-        # Try to find a tier with vowel-related names
-        for idx, name in enumerate(tier_names, 1):
-            if name and any(keyword in str(name).lower() for keyword in ['vowel', 'phone', 'segment']):
-                vowel_tier_idx = idx
-                break
-        
-        # Get number of intervals in the selected tier
-        n_intervals = int(call(textgrid, "Get number of intervals", vowel_tier_idx))
+    
+    # Try to find a tier with vowel-related names, defaulting to the first tier
+    vowel_tier_idx = next(
+        (idx for idx, name in enumerate(tier_names, 1) if name and _VOWEL_TIER_RE.search(str(name))),
+        1
+    )
+    
+    if tgt is not None:
+        intervals = tiers[vowel_tier_idx - 1].intervals
+        return [(interval.text, interval.start_time, interval.end_time)
+                for interval in intervals if interval.text and interval.text.strip()]
+    
+    # Labels in one sweep, then times only for the labeled intervals
+    n_intervals = int(call(textgrid, "Get number of intervals", vowel_tier_idx))
+    labels = [call(textgrid, "Get label of interval", vowel_tier_idx, i) for i in range(1, n_intervals + 1)]
+    return [
+        (label,
+         call(textgrid, "Get start time of interval", vowel_tier_idx, i),
+         call(textgrid, "Get end time of interval", vowel_tier_idx, i))
+        for i, label in enumerate(labels, 1) if label and label.strip()
+    ]
+
+
+def formant_columns(file_metadata, basename, **columns):
+    """
+    Column dict for one file's extracted rows: the given per-row lists plus the file
+    name and filename metadata repeated for every row
+    """
+    n_rows = len(columns['vowel'])
+    columns['file'] = [basename] * n_rows
+    # Add metadata
+    if file_metadata.get('speaker'):
+        columns['speaker'] = [file_metadata['speaker']] * n_rows
+    if file_metadata.get('native_language'):
+        columns['native_language'] = [file_metadata['native_language']] * n_rows
+    return columns
+
+
+def extract_formants_from_textgrid(sound, formant, textgrid, file_metadata, basename):
+    """Extract formants at labeled vowel intervals from TextGrid (returns a column dict)"""
+    vowels, f1_col, f2_col, times, durations = [], [], [], [], []
+    
+    try:
+        sample_formants = formant_sampler(formant)
         
-        for i in range(1, n_intervals + 1):
-            label = call(textgrid, "Get label of interval", vowel_tier_idx, i)
+        # Only labeled intervals are returned; non-vowel labels are dropped before sampling
+        intervals = [interval for interval in vowel_tier_intervals(textgrid) if is_vowel_label(interval[0])]
+        if intervals:
+            labels, starts, ends = zip(*intervals)
+            starts = np.array(starts, dtype=np.float64)
+            ends = np.array(ends, dtype=np.float64)
+            interval_durations = ends - starts
             
-            if label and label.strip():  # Non-empty label
-                start = call(textgrid, "Get start time of interval", vowel_tier_idx, i)
-                end = call(textgrid, "Get end time of interval", vowel_tier_idx, i)
-                
-                # Sample formants from the middle 25% of the duration
-                duration = end - start
+            # Intervals longer than 20ms: sample 5 points within the middle 25% of the
+            # duration (37.5% to 62.5%) and average the valid ones; all intervals at once
+            mid_starts = starts + interval_durations * 0.375
+            mid_ends = starts + interval_durations * 0.625
+            window_f1, window_f2 = sample_formants(np.linspace(mid_starts, mid_ends, 5, axis=1))
+            # NaN (undefined) values compare False and are dropped with out-of-range ones
+            window_valid = (window_f1 >= 100) & (window_f1 <= 4000) & (window_f2 >= 100) & (window_f2 <= 4000)
+            valid_counts = window_valid.sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                f1_means = np.where(window_valid, window_f1, 0.0).sum(axis=1) / valid_counts
+                f2_means = np.where(window_valid, window_f2, 0.0).sum(axis=1) / valid_counts
+            
+            # Very short segments use the midpoint
+            midpoints = (starts + ends) / 2
+            mid_f1, mid_f2 = sample_formants(midpoints)
+            mid_valid = (mid_f1 >= 100) & (mid_f1 <= 4000) & (mid_f2 >= 100) & (mid_f2 <= 4000)
+            
+            # Round to 0.1 Hz once per array rather than per row
+            f1_means, f2_means = np.round(f1_means, 1), np.round(f2_means, 1)
+            mid_f1, mid_f2 = np.round(mid_f1, 1), np.round(mid_f2, 1)
+            
+            for i, label in enumerate(labels):
+                duration = interval_durations[i]
                 if duration > 0.02:  # At least 20ms
-                    # Calculate middle 25% range: from 37.5% to 62.5% of duration
-                    mid_start = start + duration * 0.375
-                    mid_end = start + duration * 0.625
-                    
-                    # Sample at 5 points within the middle 25% and average them
-                    time_points = np.linspace(mid_start, mid_end, 5)
-                    
-                    f1_values = []
-                    f2_values = []
-                    
-                    for time_point in time_points:
-                        f1 = call(formant, "Get value at time", 1, time_point, "hertz", "linear")
-                        f2 = call(formant, "Get value at time", 2, time_point, "hertz", "linear")
-                        
-                        if f1 and f2 and not (np.isnan(f1) or np.isnan(f2)):
-                            if 100 <= f1 <= 4000 and 100 <= f2 <= 4000:
-                                f1_values.append(f1)
-                                f2_values.append(f2)
-                    
                     # Use average values if we have valid measurements
-                    if f1_values and f2_values and is_vowel_label(label):
-                        f1_avg = np.mean(f1_values)
-                        f2_avg = np.mean(f2_values)
-                        mid_time = (mid_start + mid_end) / 2
-                        
-                        data_point = {
-                            'vowel': label.strip(),
-                            'F1': round(f1_avg, 1),
-                            'F2': round(f2_avg, 1),
-                            'time': mid_time,
-                            'duration': duration * 1000,  # Convert to ms
-                            'file': basename
-                        }
-                        # Add metadata
-                        if file_metadata.get('speaker'):
-                            data_point['speaker'] = file_metadata['speaker']
-                        if file_metadata.get('native_language'):
-                            data_point['native_language'] = file_metadata['native_language']
-                        
-                        data.append(data_point)
+                    if not valid_counts[i]:
+                        continue
+                    f1, f2 = f1_means[i], f2_means[i]
+                    time_point = (mid_starts[i] + mid_ends[i]) / 2
                 else:
-                    # For very short segments, use midpoint
-                    time_point = (start + end) / 2
-                    f1 = call(formant, "Get value at time", 1, time_point, "hertz", "linear")
-                    f2 = call(formant, "Get value at time", 2, time_point, "hertz", "linear")
-                    
-                    if f1 and f2 and not (np.isnan(f1) or np.isnan(f2)):
-                        if 100 <= f1 <= 4000 and 100 <= f2 <= 4000 and is_vowel_label(label):
-                            data_point = {
-                                'vowel': label.strip(),
-                                'F1': round(f1, 1),
-                                'F2': round(f2, 1),
-                                'time': time_point,
-                                'duration': duration * 1000,  # Convert to ms
-                                'file': basename
-                            }
-                            # Add metadata
-                            if file_metadata.get('speaker'):
-                                data_point['speaker'] = file_metadata['speaker']
-                            if file_metadata.get('native_language'):
-                                data_point['native_language'] = file_metadata['native_language']
-                            
-                            data.append(data_point)
+                    if not mid_valid[i]:
+                        continue
+                    f1, f2 = mid_f1[i], mid_f2[i]
+                    time_point = midpoints[i]
+                
+                vowels.append(label.strip())
+                f1_col.append(float(f1))
+                f2_col.append(float(f2))
+                times.append(float(time_point))
+                durations.append(float(duration) * 1000)  # Convert to ms
     
     except Exception as e:
         print(f"Error extracting from TextGrid: {e}")
     
-    return data
+    return formant_columns(file_metadata, basename,
+                           vowel=vowels, F1=f1_col, F2=f2_col, time=times, duration=durations)
 
 
 def extract_formants_regular(formant, duration, file_metadata, basename):
-    """Extract formants at regular intervals when no TextGrid is available"""
-    data = []
-    
+    """Extract formants at regular intervals when no TextGrid is available (returns a column dict)"""
     # Sample every 50ms
     time_step = 0.05
     time_points = np.arange(0.1, duration - 0.1, time_step)
     
-    for time_point in time_points:
-        f1 = call(formant, "Get value at time", 1, time_point, "hertz", "linear")
-        f2 = call(formant, "Get value at time", 2, time_point, "hertz", "linear")
-        
-        if f1 and f2 and not (np.isnan(f1) or np.isnan(f2)):
-            if 100 <= f1 <= 4000 and 100 <= f2 <= 4000:
-                data_point = {
-                    'vowel': 'unlabeled',
-                    'F1': round(f1, 1),
-                    'F2': round(f2, 1),
-                    'time': time_point,
-                    'file': basename
-                }
-                # Add metadata
-                if file_metadata.get('speaker'):
-                    data_point['speaker'] = file_metadata['speaker']
-                if file_metadata.get('native_language'):
-                    data_point['native_language'] = file_metadata['native_language']
-                
-                data.append(data_point)
+    f1_values, f2_values = formant_sampler(formant)(time_points)
+    # NaN (undefined) values compare False and are dropped with out-of-range ones
+    valid = (f1_values >= 100) & (f1_values <= 4000) & (f2_values >= 100) & (f2_values <= 4000)
     
-    return data
+    times = time_points[valid]
+    return formant_columns(
+        file_metadata, basename,
+        vowel=['unlabeled'] * len(times),
+        F1=np.round(f1_values[valid], 1),
+        F2=np.round(f2_values[valid], 1),
+        time=times
+    )
@@ -3,6 +3,18 @@ Formant frequency scale conversions
 Supports: Hz, Bark, ERB, Mel scales
 """
 import numpy as np
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+# Integer codes used by the conversion kernel; unknown scale names are treated as Hz
+SCALE_CODES = {'Hz': 0, 'Bark': 1, 'ERB': 2, 'Mel': 3}
+
+# log10/10** formulas rewritten with log1p/expm1: 21.4*log10(1+x) == log1p(x) * 21.4/ln(10)
+_ERB_K = np.log(10.0) / 21.4
+_MEL_K = np.log(10.0) / 2595
 
 
 def hz_to_bark(hz):
@@ -45,7 +57,7 @@ def hz_to_erb(hz):
         Frequency in ERB
     """
     hz = np.asarray(hz)
-    return 21.4 * np.log10(1 + 0.00437 * hz)
+    return np.log1p(0.00437 * hz) / _ERB_K
 
 
 def erb_to_hz(erb):
@@ -59,7 +71,7 @@ def erb_to_hz(erb):
         Frequency in Hz
     """
     erb = np.asarray(erb)
-    return (10 ** (erb / 21.4) - 1) / 0.00437
+    return np.expm1(erb * _ERB_K) / 0.00437
 
 
 def hz_to_mel(hz):
@@ -73,7 +85,7 @@ def hz_to_mel(hz):
         Frequency in Mel
     """
     hz = np.asarray(hz)
-    return 2595 * np.log10(1 + hz / 700)
+    return np.log1p(hz / 700) / _MEL_K
 
 
 def mel_to_hz(mel):
@@ -87,12 +99,14 @@ def mel_to_hz(mel):
         Frequency in Hz
     """
     mel = np.asarray(mel)
-    return 700 * (10 ** (mel / 2595) - 1)
+    return 700 * np.expm1(mel * _MEL_K)
 
 
 def convert_formants(df, from_scale='Hz', to_scale='Bark', formant_cols=['F1', 'F2']):
     """
     Convert formant frequencies between different scales
+    Non-Hz to non-Hz conversions go through Hz; with numba installed both steps are
+    fused into one pass over the formant columns
     
     Args:
         df: DataFrame with formant columns
@@ -107,40 +121,66 @@ def convert_formants(df, from_scale='Hz', to_scale='Bark', formant_cols=['F1', '
         return df.copy()
     
     df_converted = df.copy()
-    
-    # Define conversion functions
-    conversions = {
-        ('Hz', 'Bark'): hz_to_bark,
-        ('Hz', 'ERB'): hz_to_erb,
-        ('Hz', 'Mel'): hz_to_mel,
-        ('Bark', 'Hz'): bark_to_hz,
-        ('ERB', 'Hz'): erb_to_hz,
-        ('Mel', 'Hz'): mel_to_hz,
-    }
-    
-    # Two-step conversion for non-Hz to non-Hz
-    if from_scale != 'Hz' and to_scale != 'Hz':
-        # First convert to Hz
-        if (from_scale, 'Hz') in conversions:
-            for col in formant_cols:
-                if col in df_converted.columns:
-                    df_converted[col] = conversions[(from_scale, 'Hz')](df_converted[col])
-        
-        # Then convert from Hz to target
-        if ('Hz', to_scale) in conversions:
-            for col in formant_cols:
-                if col in df_converted.columns:
-                    df_converted[col] = conversions[('Hz', to_scale)](df_converted[col])
-    else:
-        # Direct conversion
-        if (from_scale, to_scale) in conversions:
-            for col in formant_cols:
-                if col in df_converted.columns:
-                    df_converted[col] = conversions[(from_scale, to_scale)](df_converted[col])
+    from_code = SCALE_CODES.get(from_scale, 0)
+    to_code = SCALE_CODES.get(to_scale, 0)
+    if from_code == to_code:
+        return df_converted
+    
+    # All formant columns go through the conversion as one contiguous block
+    cols = [col for col in formant_cols if col in df_converted.columns]
+    if cols:
+        block = np.ascontiguousarray(df_converted[cols].to_numpy(dtype=np.float64))
+        converted = _convert_values(block.ravel(), from_code, to_code)
+        df_converted[cols] = converted.reshape(block.shape)
     
     return df_converted
 
 
+def _convert_values_numpy(values, from_code, to_code):
+    """Scale conversion with the NumPy functions above (used when numba is not installed)"""
+    to_hz = (None, bark_to_hz, erb_to_hz, mel_to_hz)[from_code]
+    from_hz = (None, hz_to_bark, hz_to_erb, hz_to_mel)[to_code]
+    if to_hz is not None:
+        values = to_hz(values)
+    if from_hz is not None:
+        values = from_hz(values)
+    return values
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _scalar_to_hz(x, code):
+        """Same formulas as bark_to_hz/erb_to_hz/mel_to_hz for one value"""
+        if code == 1:
+            return 1960 * (x + 0.53) / (26.81 - x)
+        if code == 2:
+            return np.expm1(x * _ERB_K) / 0.00437
+        if code == 3:
+            return 700 * np.expm1(x * _MEL_K)
+        return x
+
+    @njit(cache=True)
+    def _scalar_from_hz(hz, code):
+        """Same formulas as hz_to_bark/hz_to_erb/hz_to_mel for one value"""
+        if code == 1:
+            return 26.81 * hz / (1960 + hz) - 0.53
+        if code == 2:
+            return np.log1p(0.00437 * hz) / _ERB_K
+        if code == 3:
+            return np.log1p(hz / 700) / _MEL_K
+        return hz
+
+    @njit(parallel=True, cache=True)
+    def _convert_values(values, from_code, to_code):
+        """Convert a 1-D float64 array from one scale code to another in a single pass"""
+        out = np.empty_like(values)
+        for i in prange(values.shape[0]):
+            out[i] = _scalar_from_hz(_scalar_to_hz(values[i], from_code), to_code)
+        return out
+else:
+    _convert_values = _convert_values_numpy
+
+
 def get_scale_label(scale):
     """
     Get axis label for a given scale
@@ -0,0 +1,119 @@
+"""
+Per-vowel outlier removal for extracted formant data
+"""
+import numpy as np
+import pandas as pd
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+
+# Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+
+
+def remove_outliers_by_vowel(df, threshold=3):
+    """
+    Remove outliers from formant data on a per-vowel basis (Hampel filter).
+    Values further than threshold scaled MADs from the vowel's median are removed;
+    unlike mean±std, the median and MAD are not pulled along by the outliers
+    themselves, so a single pass is enough.
+
+    Args:
+        df: DataFrame with 'vowel', 'F1', 'F2' columns
+        threshold: Number of scaled MADs for outlier detection (default: 3)
+
+    Returns:
+        DataFrame with outliers removed
+    """
+    if df.empty or 'vowel' not in df.columns:
+        return df
+
+    if njit is not None:
+        codes, n_groups = _vowel_codes(df['vowel'])
+        mask = _outlier_mask(
+            codes, n_groups,
+            df['F1'].to_numpy(dtype=np.float64), df['F2'].to_numpy(dtype=np.float64),
+            float(threshold) * MAD_SCALE
+        )
+    else:
+        mask = _outlier_mask_pandas(df, threshold)
+
+    return df[mask].reset_index(drop=True)
+
+
+def _vowel_codes(vowels):
+    """
+    Integer group codes (-1 = missing) and group count for the vowel column
+    Categorical columns (as produced by the data processors) already carry their
+    codes, so only other dtypes need to be hashed with factorize
+    """
+    if isinstance(vowels.dtype, pd.CategoricalDtype):
+        return vowels.cat.codes.to_numpy(dtype=np.int64), len(vowels.cat.categories)
+    codes, uniques = pd.factorize(vowels)
+    return codes.astype(np.int64), len(uniques)
+
+
+def _outlier_mask_pandas(df, threshold):
+    """Keep-mask computed with groupby transforms (used when numba is not installed)"""
+    formants = df[['F1', 'F2']]
+    vowels = df['vowel']
+    medians = formants.groupby(vowels, observed=True).transform('median')
+    deviations = (formants - medians).abs()
+    limits = threshold * MAD_SCALE * deviations.groupby(vowels, observed=True).transform('median')
+
+    # Keep only values within the MAD limit of their vowel's median
+    within = (deviations['F1'] <= limits['F1']) & (deviations['F2'] <= limits['F2'])
+    # Need at least 3 points for meaningful stats; smaller groups are kept as-is
+    small = vowels.groupby(vowels, observed=True).transform('size') < 3
+
+    return (within | small).to_numpy()
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _outlier_mask(codes, n_groups, f1, f2, k):
+        """
+        Keep-mask from factorized vowel codes (-1 = missing label); k is the
+        threshold already multiplied by MAD_SCALE
+        Matches the pandas version: NaN formants are skipped in the median and
+        MAD and their rows dropped, groups under 3 rows are kept whole
+        """
+        n = codes.shape[0]
+        size = np.zeros(n_groups, np.int64)
+        for i in range(n):
+            if codes[i] >= 0:
+                size[codes[i]] += 1
+
+        # Rows sorted by code; missing labels (-1) sort first and are skipped
+        order = np.argsort(codes, kind='mergesort')
+        start = np.empty(n_groups, np.int64)
+        pos = n - size.sum()
+        for g in range(n_groups):
+            start[g] = pos
+            pos += size[g]
+
+        center = np.full((n_groups, 2), np.nan)
+        limit = np.full((n_groups, 2), np.nan)
+        for g in prange(n_groups):
+            rows = order[start[g]:start[g] + size[g]]
+            for j in range(2):
+                x = f1[rows] if j == 0 else f2[rows]
+                x = x[~np.isnan(x)]
+                if x.size > 0:
+                    med = np.median(x)
+                    center[g, j] = med
+                    limit[g, j] = k * np.median(np.abs(x - med))
+
+        mask = np.empty(n, np.bool_)
+        for i in prange(n):
+            g = codes[i]
+            if g < 0:
+                mask[i] = False
+            elif size[g] < 3:
+                mask[i] = True
+            else:
+                # NaN values or limits compare False and drop the row
+                mask[i] = (abs(f1[i] - center[g, 0]) <= limit[g, 0]) and (abs(f2[i] - center[g, 1]) <= limit[g, 1])
+        return mask
@@ -0,0 +1,189 @@
+"""
+Upload and analysis processing steps that can run in a worker process
+"""
+import io
+import logging
+import random
+from .data_processor import process_csv_xlsx_stream
+from .formant_scales import convert_formants, get_scale_label
+from .statistics import perform_comprehensive_analysis
+from .visualizer import (
+    create_static_vowel_space,
+    create_dynamic_formant_trajectory,
+    create_vowel_space_with_ellipses,
+    create_pca_plot,
+    create_lda_plot,
+    create_boxplot,
+    create_violin_plot,
+    create_histogram,
+    create_scatter_matrix,
+    create_mean_comparison_plot,
+    create_pairwise_comparison_plot
+)
+
+logger = logging.getLogger(__name__)
+
+
+def create_upload_plot(data, visualization_type, show_ellipses, show_points, scale_label):
+    """
+    Create the vowel space plot requested from the upload form
+
+    Args:
+        data: DataFrame with formant data (already converted to the target scale)
+        visualization_type: 'static', 'dynamic' or 'ellipse'
+        show_ellipses: Draw confidence ellipses on the static plot
+        show_points: Draw individual points on ellipse plots
+        scale_label: Axis label for the formant scale
+
+    Returns:
+        Plot dict, or None if the visualization failed
+    """
+    if visualization_type == 'static':
+        if show_ellipses:
+            return create_vowel_space_with_ellipses(data, confidence_level=0.95, show_points=show_points, scale=scale_label)
+        return create_static_vowel_space(data, scale=scale_label)
+    elif visualization_type == 'dynamic':
+        return create_dynamic_formant_trajectory(data, scale=scale_label)
+    elif visualization_type == 'ellipse':
+        return create_vowel_space_with_ellipses(data, confidence_level=0.95, show_points=show_points, scale=scale_label)
+    return create_static_vowel_space(data, scale=scale_label)
+
+
+def render_spreadsheet(raw, ext, plot_options=None):
+    """
+    Parse a spreadsheet upload and optionally build its plot
+    Takes raw bytes instead of an open stream so it can be submitted to a process pool
+
+    Args:
+        raw: File contents
+        ext: Lowercase file extension ('csv', 'txt', 'xlsx', 'xls')
+        plot_options: Optional tuple (visualization_type, show_ellipses, show_points, formant_scale);
+            when given, a copy of data converted to the requested scale is plotted
+
+    Returns:
+        tuple (data, detection_info, plot_json); data is always in Hz and
+        plot_json is None when no plot was built
+    """
+    result = process_csv_xlsx_stream(io.BytesIO(raw), ext, auto_detect=True)
+    if isinstance(result, tuple):
+        data, detection_info = result
+    else:
+        data, detection_info = result, None
+
+    if plot_options is None or data is None or data.empty:
+        return data, detection_info, None
+
+    visualization_type, show_ellipses, show_points, formant_scale = plot_options
+    plot_data = data
+    if formant_scale != 'Hz':
+        plot_data = convert_formants(data, from_scale='Hz', to_scale=formant_scale)
+    plot_json = create_upload_plot(plot_data, visualization_type, show_ellipses, show_points, get_scale_label(formant_scale))
+    return data, detection_info, plot_json
+
+
+def render_analysis(data, formant_scale='Hz'):
+    """
+    Run the statistical analysis and build its plots
+
+    Args:
+        data: DataFrame with formant data in Hz
+        formant_scale: Scale to convert to before analysis ('Hz', 'Bark', 'ERB', 'Mel')
+
+    Returns:
+        tuple (analysis_results, plots)
+    """
+    # Limit speakers to 10 randomly if more than 10
+    if 'speaker' in data.columns:
+        unique_speakers = data['speaker'].unique()
+        if len(unique_speakers) > 10:
+            random.seed(42)  # For reproducibility
+            selected_speakers = random.sample(list(unique_speakers), 10)
+            data = data[data['speaker'].isin(selected_speakers)].copy()
+            logger.debug("Limited to 10 random speakers from %d total speakers", len(unique_speakers))
+
+    # Convert formant scale if needed
+    if formant_scale != 'Hz':
+        data = convert_formants(data, from_scale='Hz', to_scale=formant_scale)
+
+    # Perform comprehensive analysis
+    analysis_results = perform_comprehensive_analysis(data)
+
+    # Create visualizations with scale label
+    scale_label = get_scale_label(formant_scale)
+    plots = {}
+
+    # PCA plot
+    if 'pca_data' in analysis_results:
+        plots['pca'] = create_pca_plot(analysis_results['pca_data'], analysis_results['pca'], scale=scale_label)
+
+    # LDA plots
+    if 'vowel' in data.columns and 'lda_data_vowel' in analysis_results:
+        plots['lda_vowel'] = create_lda_plot(
+            analysis_results['lda_data_vowel'],
+            analysis_results['lda']['vowel'],
+            group_by='vowel',
+            scale=scale_label
+        )
+
+    if 'speaker' in data.columns and 'lda_data_speaker' in analysis_results:
+        plots['lda_speaker'] = create_lda_plot(
+            analysis_results['lda_data_speaker'],
+            analysis_results['lda']['speaker'],
+            group_by='speaker',
+            scale=scale_label
+        )
+
+    if 'native_language' in data.columns and 'lda_data_native_language' in analysis_results:
+        plots['lda_language'] = create_lda_plot(
+            analysis_results['lda_data_native_language'],
+            analysis_results['lda']['native_language'],
+            group_by='native_language',
+            scale=scale_label
+        )
+
+    # Statistical plots - create for each available grouping variable
+    grouping_vars = []
+    if 'vowel' in data.columns:
+        grouping_vars.append('vowel')
+    if 'speaker' in data.columns:
+        grouping_vars.append('speaker')
+    if 'native_language' in data.columns:
+        grouping_vars.append('native_language')
+
+    for group_var in grouping_vars:
+        # Box plot
+        boxplot = create_boxplot(data, group_by=group_var, scale=scale_label)
+        if boxplot:
+            plots[f'boxplot_{group_var}'] = boxplot
+
+        # Violin plot
+        violin = create_violin_plot(data, group_by=group_var, scale=scale_label)
+        if violin:
+            plots[f'violin_{group_var}'] = violin
+
+        # Histogram
+        histogram = create_histogram(data, group_by=group_var, scale=scale_label)
+        if histogram:
+            plots[f'histogram_{group_var}'] = histogram
+
+        # Mean comparison plot
+        mean_plot = create_mean_comparison_plot(data, group_by=group_var, scale=scale_label)
+        if mean_plot:
+            plots[f'mean_comparison_{group_var}'] = mean_plot
+
+        # Pairwise comparison plot
+        if 'pairwise' in analysis_results and group_var in analysis_results['pairwise']:
+            pairwise_plot = create_pairwise_comparison_plot(
+                analysis_results['pairwise'][group_var],
+                scale=scale_label
+            )
+            if pairwise_plot:
+                plots[f'pairwise_{group_var}'] = pairwise_plot
+
+    # Scatter matrix (not grouped)
+    if grouping_vars:
+        scatter_matrix = create_scatter_matrix(data, color_by=grouping_vars[0])
+        if scatter_matrix:
+            plots['scatter_matrix'] = scatter_matrix
+
+    return analysis_results, plots
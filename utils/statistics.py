@@ -5,13 +5,19 @@ Includes multivariate analysis: MANOVA, PCA, LDA, descriptive statistics
 import pandas as pd
 import numpy as np
 from scipy import stats
-from sklearn.decomposition import PCA
+from scipy.stats import f as f_dist
+from scipy.spatial import ConvexHull
 from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
 from sklearn.preprocessing import StandardScaler
 import warnings
 warnings.filterwarnings('ignore')
 
 
+# Summary statistics reported per formant, followed by the quartiles (overall only)
+# and the count
+DESCRIPTIVE_STATS = ['mean', 'std', 'min', 'max', 'median']
+
+
 def calculate_descriptive_statistics(df, group_by=None):
     """
     Calculate descriptive statistics for F1 and F2
@@ -28,36 +34,40 @@ def calculate_descriptive_statistics(df, group_by=None):
         'by_group': {}
     }
     
+    formants = [formant for formant in ['F1', 'F2'] if formant in df.columns]
+    
     # Overall statistics
-    for formant in ['F1', 'F2']:
-        if formant in df.columns:
-            results['overall'][formant] = {
-                'mean': float(df[formant].mean()),
-                'std': float(df[formant].std()),
-                'min': float(df[formant].min()),
-                'max': float(df[formant].max()),
-                'median': float(df[formant].median()),
-                'q25': float(df[formant].quantile(0.25)),
-                'q75': float(df[formant].quantile(0.75)),
-                'count': int(df[formant].count())
-            }
+    if formants:
+        overall = df[formants].agg(DESCRIPTIVE_STATS + ['count'])
+        quartiles = df[formants].quantile([0.25, 0.75])
+        for formant in formants:
+            summary = {stat: float(overall.at[stat, formant]) for stat in DESCRIPTIVE_STATS}
+            summary['q25'] = float(quartiles.at[0.25, formant])
+            summary['q75'] = float(quartiles.at[0.75, formant])
+            summary['count'] = int(overall.at['count', formant])
+            results['overall'][formant] = summary
     
     # Group-wise statistics
     if group_by and group_by in df.columns:
-        for group in df[group_by].unique():
-            group_data = df[df[group_by] == group]
+        groups = df[group_by].unique()
+        by_group = {}
+        if formants:
+            # One aggregation pass for all groups; groups without rows (missing labels) get NaN
+            aggregated = (
+                df.groupby(group_by, observed=True, sort=False)[formants]
+                .agg(DESCRIPTIVE_STATS + ['count'])
+                .reindex(groups)
+            )
+            by_group = {key: aggregated[key].to_numpy(dtype=np.float64) for key in aggregated.columns}
+        
+        for i, group in enumerate(groups):
             results['by_group'][str(group)] = {}
             
-            for formant in ['F1', 'F2']:
-                if formant in group_data.columns:
-                    results['by_group'][str(group)][formant] = {
-                        'mean': float(group_data[formant].mean()),
-                        'std': float(group_data[formant].std()),
-                        'min': float(group_data[formant].min()),
-                        'max': float(group_data[formant].max()),
-                        'median': float(group_data[formant].median()),
-                        'count': int(group_data[formant].count())
-                    }
+            for formant in formants:
+                summary = {stat: float(by_group[formant, stat][i]) for stat in DESCRIPTIVE_STATS}
+                count = by_group[formant, 'count'][i]
+                summary['count'] = int(count) if count == count else 0
+                results['by_group'][str(group)][formant] = summary
     
     return results
 
@@ -110,37 +120,36 @@ def perform_manova(df, group_by='vowel'):
     # Overall multivariate test (Hotelling's T-squared approximation)
     # Using Wilks' Lambda approach
     try:
-        from scipy.stats import f as f_dist
-        
         # Calculate group means
-        X = df[['F1', 'F2']].values
-        y = df[group_by].values
+        X = df[['F1', 'F2']].to_numpy(dtype=np.float64)
+        # Integer group ids in one pass (-1 = missing label, left out of both scatters)
+        codes, uniques = pd.factorize(df[group_by])
         
         # Between-group and within-group scatter matrices
         overall_mean = X.mean(axis=0)
         n_total = len(X)
         n_groups_val = len(groups)
         
-        # Calculate Wilks' Lambda
-        W = np.zeros((2, 2))  # Within-group scatter
-        B = np.zeros((2, 2))  # Between-group scatter
+        labeled = codes >= 0
+        counts = np.bincount(codes[labeled], minlength=len(uniques))
+        group_sums = np.column_stack([
+            np.bincount(codes[labeled], weights=X[labeled, j], minlength=len(uniques))
+            for j in range(2)
+        ])
+        group_means = group_sums / counts[:, None]
         
-        for group in groups:
-            group_mask = y == group
-            X_group = X[group_mask]
-            n_group = len(X_group)
-            
-            if n_group > 1:
-                group_mean = X_group.mean(axis=0)
-                
-                # Within-group scatter
-                for xi in X_group:
-                    diff = xi - group_mean
-                    W += np.outer(diff, diff)
-                
-                # Between-group scatter
-                diff_mean = group_mean - overall_mean
-                B += n_group * np.outer(diff_mean, diff_mean)
+        # Groups with a single observation contribute to neither scatter
+        used = counts > 1
+        rows = labeled.copy()
+        rows[labeled] = used[codes[labeled]]
+        
+        # Within-group scatter
+        diff = X[rows] - group_means[codes[rows]]
+        W = diff.T @ diff
+        
+        # Between-group scatter
+        diff_mean = group_means[used] - overall_mean
+        B = (diff_mean.T * counts[used]) @ diff_mean
         
         # Wilks' Lambda
         det_W = np.linalg.det(W)
@@ -165,33 +174,57 @@ def perform_manova(df, group_by='vowel'):
     return results
 
 
-def perform_pca(df):
+def standardize_formants(df):
+    """
+    Standardize F1 and F2 to zero mean and unit variance
+    Done once per analysis so PCA and every LDA share the scaled values
+    
+    Args:
+        df: DataFrame with F1, F2 columns
+    
+    Returns:
+        tuple (X_scaled, fitted StandardScaler)
+    """
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(df[['F1', 'F2']].values)
+    return X_scaled, scaler
+
+
+def perform_pca(df, standardized=None):
     """
     Perform Principal Component Analysis on F1 and F2
+    With two features the components come straight from the eigendecomposition
+    of the 2x2 covariance matrix
     
     Args:
         df: DataFrame with F1, F2 columns
+        standardized: Optional result of standardize_formants(df) to reuse
     
     Returns:
         dict with PCA results and transformed data
     """
-    # Prepare data
-    X = df[['F1', 'F2']].values
-    
     # Standardize
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    X_scaled, scaler = standardized if standardized is not None else standardize_formants(df)
     
     # Perform PCA
-    pca = PCA(n_components=2)
-    X_pca = pca.fit_transform(X_scaled)
+    centered = X_scaled - X_scaled.mean(axis=0)
+    covariance = centered.T @ centered / (len(centered) - 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    order = eigenvalues.argsort()[::-1]
+    explained_variance = np.clip(eigenvalues[order], 0, None)
+    components = eigenvectors[:, order].T
+    # Same sign convention as scikit-learn's PCA: the largest loading of each component is positive
+    largest = np.abs(components).argmax(axis=1)
+    components *= np.sign(components[np.arange(len(components)), largest])[:, None]
+    explained_variance_ratio = explained_variance / explained_variance.sum()
+    X_pca = centered @ components.T
     
     # Create results
     results = {
-        'explained_variance': pca.explained_variance_.tolist(),
-        'explained_variance_ratio': pca.explained_variance_ratio_.tolist(),
-        'cumulative_variance_ratio': np.cumsum(pca.explained_variance_ratio_).tolist(),
-        'components': pca.components_.tolist(),
+        'explained_variance': explained_variance.tolist(),
+        'explained_variance_ratio': explained_variance_ratio.tolist(),
+        'cumulative_variance_ratio': np.cumsum(explained_variance_ratio).tolist(),
+        'components': components.tolist(),
         'mean': scaler.mean_.tolist(),
         'scale': scaler.scale_.tolist()
     }
@@ -204,13 +237,14 @@ def perform_pca(df):
     return results, df_result
 
 
-def perform_lda(df, group_by='vowel'):
+def perform_lda(df, group_by='vowel', standardized=None):
     """
     Perform Linear Discriminant Analysis
     
     Args:
         df: DataFrame with F1, F2, and grouping column
         group_by: Column name for grouping
+        standardized: Optional result of standardize_formants(df) to reuse
     
     Returns:
         dict with LDA results and transformed data
@@ -219,8 +253,7 @@ def perform_lda(df, group_by='vowel'):
         return {'error': f'Column {group_by} not found'}, df
     
     # Prepare data
-    X = df[['F1', 'F2']].values
-    y = df[group_by].values
+    y = df[group_by].to_numpy()
     
     # Check number of groups
     n_groups = len(np.unique(y))
@@ -229,8 +262,7 @@ def perform_lda(df, group_by='vowel'):
         return {'error': 'Need at least 2 groups for LDA'}, df
     
     # Standardize
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    X_scaled, _ = standardized if standardized is not None else standardize_formants(df)
     
     # Perform LDA
     n_components = min(n_groups - 1, 2)
@@ -288,37 +320,53 @@ def perform_pairwise_tests(df, group_by='vowel'):
         'comparisons': {}
     }
     
-    # Pairwise comparisons
-    for i, group1 in enumerate(groups):
-        for group2 in groups[i+1:]:
-            comparison_key = f"{group1}_vs_{group2}"
-            results['comparisons'][comparison_key] = {}
+    # Per-group count, mean and variance from one groupby pass per formant; every pair
+    # is then tested from these summaries (pooled-variance t-test, as in stats.ttest_ind)
+    first, second = np.triu_indices(len(groups), 1)
+    pair_stats = {}
+    for formant in ['F1', 'F2']:
+        if formant in df.columns:
+            summary = (
+                df.groupby(group_by, observed=True, sort=False)[formant]
+                .agg(['count', 'mean', 'var'])
+                .reindex(groups)
+            )
+            n = summary['count'].fillna(0).to_numpy(dtype=np.float64)
+            mean = summary['mean'].to_numpy(dtype=np.float64)
+            var = summary['var'].to_numpy(dtype=np.float64)
             
-            data1 = df[df[group_by] == group1]
-            data2 = df[df[group_by] == group2]
+            # Sum of squared deviations; a single observation has none (its var is NaN)
+            sq_dev = np.where(n > 1, (n - 1) * var, 0.0)
             
-            for formant in ['F1', 'F2']:
-                if formant in df.columns:
-                    vals1 = data1[formant].dropna().values
-                    vals2 = data2[formant].dropna().values
-                    
-                    if len(vals1) > 0 and len(vals2) > 0:
-                        # Perform t-test
-                        t_stat, p_value = stats.ttest_ind(vals1, vals2)
-                        
-                        # Calculate Cohen's d (effect size)
-                        pooled_std = np.sqrt(((len(vals1)-1)*np.var(vals1, ddof=1) + 
-                                               (len(vals2)-1)*np.var(vals2, ddof=1)) / 
-                                              (len(vals1) + len(vals2) - 2))
-                        cohens_d = (np.mean(vals1) - np.mean(vals2)) / pooled_std if pooled_std > 0 else 0
-                        
-                        results['comparisons'][comparison_key][formant] = {
-                            't_statistic': float(t_stat),
-                            'p_value': float(p_value),
-                            'cohens_d': float(cohens_d),
-                            'significant': bool(p_value < 0.05),
-                            'mean_diff': float(np.mean(vals1) - np.mean(vals2))
-                        }
+            n1, n2 = n[first], n[second]
+            dof = n1 + n2 - 2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pooled_var = (sq_dev[first] + sq_dev[second]) / dof
+                mean_diff = mean[first] - mean[second]
+                t_stat = mean_diff / np.sqrt(pooled_var * (1 / n1 + 1 / n2))
+                p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+                
+                # Cohen's d (effect size); reported as 0 when either group has no sample variance
+                pooled_std = np.sqrt(pooled_var)
+                has_var = (pooled_std > 0) & (n1 > 1) & (n2 > 1)
+                cohens_d = np.where(has_var, mean_diff / pooled_std, 0.0)
+            
+            tested = (n1 > 0) & (n2 > 0)
+            pair_stats[formant] = (tested, t_stat, p_value, cohens_d, mean_diff)
+    
+    # Pairwise comparisons
+    for k, (i, j) in enumerate(zip(first, second)):
+        comparison = results['comparisons'][f"{groups[i]}_vs_{groups[j]}"] = {}
+        
+        for formant, (tested, t_stat, p_value, cohens_d, mean_diff) in pair_stats.items():
+            if tested[k]:
+                comparison[formant] = {
+                    't_statistic': float(t_stat[k]),
+                    'p_value': float(p_value[k]),
+                    'cohens_d': float(cohens_d[k]),
+                    'significant': bool(p_value[k] < 0.05),
+                    'mean_diff': float(mean_diff[k])
+                }
     
     return results
 
@@ -334,8 +382,6 @@ def calculate_vowel_space_metrics(df, group_by=None):
     Returns:
         dict with vowel space metrics
     """
-    from scipy.spatial import ConvexHull
-    
     results = {}
     
     def calc_metrics(data):
@@ -352,7 +398,8 @@ def calculate_vowel_space_metrics(df, group_by=None):
             centroid = points.mean(axis=0)
             
             # Calculate dispersion (average distance from centroid)
-            distances = np.sqrt(np.sum((points - centroid)**2, axis=1))
+            offsets = points - centroid
+            distances = np.sqrt(np.einsum('ij,ij->i', offsets, offsets))
             dispersion = float(np.mean(distances))
             
             return {
@@ -370,7 +417,7 @@ def calculate_vowel_space_metrics(df, group_by=None):
     # Overall metrics
     if 'vowel' in df.columns and len(df['vowel'].unique()) >= 3:
         # Calculate area using vowel means
-        vowel_means = df.groupby('vowel')[['F1', 'F2']].mean().reset_index()
+        vowel_means = df.groupby('vowel', observed=True)[['F1', 'F2']].mean().reset_index()
         results['overall'] = calc_metrics(vowel_means)
     else:
         results['overall'] = calc_metrics(df)
@@ -378,12 +425,14 @@ def calculate_vowel_space_metrics(df, group_by=None):
     # Group-wise metrics
     if group_by and group_by in df.columns:
         results['by_group'] = {}
+        # Partition the rows once; groups without rows (missing labels) get no metrics
+        group_frames = dict(iter(df.groupby(group_by, observed=True, sort=False)))
         
         for group in df[group_by].unique():
-            group_data = df[df[group_by] == group]
+            group_data = group_frames.get(group, df.iloc[:0])
             
             if 'vowel' in group_data.columns and len(group_data['vowel'].unique()) >= 3:
-                vowel_means = group_data.groupby('vowel')[['F1', 'F2']].mean().reset_index()
+                vowel_means = group_data.groupby('vowel', observed=True)[['F1', 'F2']].mean().reset_index()
                 results['by_group'][str(group)] = calc_metrics(vowel_means)
             else:
                 results['by_group'][str(group)] = calc_metrics(group_data)
@@ -427,14 +476,17 @@ def perform_comprehensive_analysis(df):
     for group_var in group_vars:
         results['manova'][group_var] = perform_manova(df, group_by=group_var)
     
+    # PCA and LDA share one standardization of F1/F2
+    standardized = standardize_formants(df)
+    
     # PCA
-    pca_results, df_pca = perform_pca(df)
+    pca_results, df_pca = perform_pca(df, standardized)
     results['pca'] = pca_results
     results['pca_data'] = df_pca
     
     # LDA
     for group_var in group_vars:
-        lda_results, df_lda = perform_lda(df, group_by=group_var)
+        lda_results, df_lda = perform_lda(df, group_by=group_var, standardized=standardized)
         results['lda'][group_var] = lda_results
         results['lda_data_' + group_var] = df_lda
     
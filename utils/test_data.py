@@ -27,33 +27,35 @@ def generate_test_data():
         ('Speaker_F', 'Japanese', -10, -100),
     ]
     
-    data = []
-    
-    for speaker_name, native_lang, f1_shift, f2_shift in speakers:
-        for vowel, formants in vowel_prototypes.items():
-            # 각 모음당 10개 데이터 포인트 생성 (시간에 따른 변화)
-            for i in range(10):
-                time = i * 0.05  # 0.05초 간격
-                
-                # 약간의 무작위 변동 추가
-                f1 = formants['F1'] + f1_shift + np.random.normal(0, 20)
-                f2 = formants['F2'] + f2_shift + np.random.normal(0, 50)
-                
-                # 시간에 따른 약간의 변화
-                f1 += np.sin(time * 2 * np.pi) * 10
-                f2 += np.cos(time * 2 * np.pi) * 30
-                
-                data.append({
-                    'speaker': speaker_name,
-                    'native_language': native_lang,
-                    'vowel': vowel,
-                    'F1': max(200, f1),  # 최소값 제한
-                    'F2': max(500, f2),
-                    'time': time,
-                    'duration': 0.5
-                })
-    
-    return pd.DataFrame(data)
+    n_speakers = len(speakers)
+    n_vowels = len(vowel_prototypes)
+    n_points = 10  # 각 모음당 10개 데이터 포인트 생성 (시간에 따른 변화)
+    
+    time = np.arange(n_points) * 0.05  # 0.05초 간격
+    
+    # (화자, 모음) 기준값: shape (n_speakers, n_vowels, 1)
+    base_f1 = np.array([[formants['F1'] + s[2] for formants in vowel_prototypes.values()] for s in speakers])[:, :, None]
+    base_f2 = np.array([[formants['F2'] + s[3] for formants in vowel_prototypes.values()] for s in speakers])[:, :, None]
+    
+    # 약간의 무작위 변동 추가 (행마다 F1, F2 순서로 한 번에 생성)
+    noise = np.random.normal(0, (20, 50), size=(n_speakers, n_vowels, n_points, 2))
+    f1 = base_f1 + noise[..., 0]
+    f2 = base_f2 + noise[..., 1]
+    
+    # 시간에 따른 약간의 변화
+    f1 += np.sin(time * 2 * np.pi) * 10
+    f2 += np.cos(time * 2 * np.pi) * 30
+    
+    rows_per_speaker = n_vowels * n_points
+    return pd.DataFrame({
+        'speaker': np.repeat([s[0] for s in speakers], rows_per_speaker),
+        'native_language': np.repeat([s[1] for s in speakers], rows_per_speaker),
+        'vowel': np.tile(np.repeat(list(vowel_prototypes), n_points), n_speakers),
+        'F1': np.maximum(f1, 200).ravel(),  # 최소값 제한
+        'F2': np.maximum(f2, 500).ravel(),
+        'time': np.tile(time, n_speakers * n_vowels),
+        'duration': 0.5
+    })
 
 
 def save_test_data_to_csv(filename='test_multi_speaker.csv'):
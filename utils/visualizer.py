@@ -1,12 +1,14 @@
 """
 Visualization utilities for creating vowel space and formant trajectory plots
 """
+import traceback
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-import json
 from scipy import stats
+from scipy.stats import gaussian_kde
 
 # Custom color palette - dark colors without yellow
 CUSTOM_COLORS = [
@@ -296,11 +298,10 @@ def create_static_vowel_space(df, scale='Hz'):
             )
         )
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating static vowel space: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -325,7 +326,7 @@ def create_dynamic_formant_trajectory(df, scale='Hz'):
         
         # Group by vowel and add sequence number
         df = df.copy()
-        df['sequence'] = df.groupby('vowel').cumcount()
+        df['sequence'] = df.groupby('vowel', observed=True).cumcount()
         time_col = 'sequence'
         time_label = 'Sequence'
     else:
@@ -494,7 +495,7 @@ def create_dynamic_formant_trajectory(df, scale='Hz'):
         )
     )
     
-    return json.loads(fig.to_json())
+    return fig.to_plotly_json()
 
 
 def create_formant_over_time(df):
@@ -555,7 +556,7 @@ def create_formant_over_time(df):
         hovermode='x unified'
     )
     
-    return json.loads(fig.to_json())
+    return fig.to_plotly_json()
 
 
 def create_vowel_space_with_ellipses(df, confidence=0.95, show_points=True):
@@ -868,11 +869,10 @@ def create_vowel_space_with_ellipses(df, confidence=0.95, show_points=True):
             )
         )
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating vowel space with ellipses: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -890,8 +890,6 @@ def calculate_confidence_ellipse(x, y, n_std=2.0, n_points=100):
     Returns:
         tuple: (ellipse_x, ellipse_y) arrays for plotting
     """
-    from scipy import stats
-    
     if len(x) < 3 or len(y) < 3:
         return None, None
     
@@ -1141,11 +1139,10 @@ def create_vowel_space_with_ellipses(df, confidence_level=0.95, show_points=True
             )
         )
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating vowel space with ellipses: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1260,11 +1257,10 @@ def create_pca_plot(df_pca, pca_results, scale='Hz'):
         fig.update_xaxes(showgrid=True, gridcolor='lightgray', zeroline=True, zerolinecolor='black')
         fig.update_yaxes(showgrid=True, gridcolor='lightgray', zeroline=True, zerolinecolor='black')
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating PCA plot: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1335,11 +1331,10 @@ def create_lda_plot(df_lda, lda_results, group_by='vowel', scale='Hz'):
         fig.update_xaxes(showgrid=True, gridcolor='lightgray', zeroline=True, zerolinecolor='black')
         fig.update_yaxes(showgrid=True, gridcolor='lightgray', zeroline=True, zerolinecolor='black')
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating LDA plot: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1360,8 +1355,6 @@ def create_boxplot(df, group_by='vowel', scale='Hz'):
         return None
     
     try:
-        from plotly.subplots import make_subplots
-        
         # Create subplots for F1 and F2
         fig = make_subplots(
             rows=1, cols=2,
@@ -1423,11 +1416,10 @@ def create_boxplot(df, group_by='vowel', scale='Hz'):
         fig.update_xaxes(title_text=group_by, row=1, col=1)
         fig.update_xaxes(title_text=group_by, row=1, col=2)
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating boxplot: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1448,8 +1440,6 @@ def create_violin_plot(df, group_by='vowel', scale='Hz'):
         return None
     
     try:
-        from plotly.subplots import make_subplots
-        
         fig = make_subplots(
             rows=1, cols=2,
             subplot_titles=(f'F1 Distribution by {group_by}', f'F2 Distribution by {group_by}'),
@@ -1514,11 +1504,10 @@ def create_violin_plot(df, group_by='vowel', scale='Hz'):
         fig.update_xaxes(title_text=group_by, row=1, col=1)
         fig.update_xaxes(title_text=group_by, row=1, col=2)
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating violin plot: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1539,9 +1528,6 @@ def create_histogram(df, group_by='vowel', scale='Hz'):
         return None
     
     try:
-        from plotly.subplots import make_subplots
-        from scipy.stats import gaussian_kde
-        
         fig = make_subplots(
             rows=1, cols=2,
             subplot_titles=('F1 Distribution (Density)', 'F2 Distribution (Density)'),
@@ -1670,11 +1656,10 @@ def create_histogram(df, group_by='vowel', scale='Hz'):
         fig.update_yaxes(title_text="Density", row=1, col=1, showgrid=True, gridcolor='lightgray')
         fig.update_yaxes(title_text="Density", row=1, col=2, showgrid=True, gridcolor='lightgray')
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating histogram: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1727,11 +1712,10 @@ def create_scatter_matrix(df, color_by='vowel'):
             font=dict(size=10)
         )
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating scatter matrix: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1752,8 +1736,6 @@ def create_mean_comparison_plot(df, group_by='vowel', scale='Hz'):
         return None
     
     try:
-        from plotly.subplots import make_subplots
-        
         # Calculate statistics by group
         stats_data = []
         for group in sorted(df[group_by].unique()):
@@ -1820,11 +1802,10 @@ def create_mean_comparison_plot(df, group_by='vowel', scale='Hz'):
         fig.update_xaxes(title_text=group_by, row=1, col=1)
         fig.update_xaxes(title_text=group_by, row=1, col=2)
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating mean comparison plot: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -1844,8 +1825,6 @@ def create_pairwise_comparison_plot(pairwise_results, scale='Hz'):
         return None
     
     try:
-        from plotly.subplots import make_subplots
-        
         comparisons = pairwise_results.get('comparisons', {})
         if not comparisons:
             return None
@@ -1946,11 +1925,10 @@ def create_pairwise_comparison_plot(pairwise_results, scale='Hz'):
         fig.update_xaxes(row=1, col=1, tickangle=-45)
         fig.update_xaxes(row=1, col=2, tickangle=-45)
         
-        return json.loads(fig.to_json())
+        return fig.to_plotly_json()
     
     except Exception as e:
         print(f"Error creating pairwise comparison plot: {e}")
-        import traceback
         print(traceback.format_exc())
         return None
 
@@ -0,0 +1,8 @@
+"""
+WSGI entry point for production servers, e.g.
+gunicorn -w $(nproc) -k gthread --threads 4 -t 120 wsgi:app
+"""
+from app import app
+
+if __name__ == '__main__':
+    app.run()